@@ -1,4 +1,5 @@
 from __future__ import annotations
+import os
 from typing import Any, Dict, List, Tuple
 
 import verifiers as vf
@@ -7,7 +8,8 @@ from verifiers.parsers import Parser
 
 from .dataset import load_examples
 from .metrics import iou_score
-from baselines.screenspot_pro import text_rule, region_search
+from envs.screenspot_pro.scoring import BatchedScorer, FallbackMemo
+from baselines.screenspot_pro import BASELINES, ImageSize, needs_pixels
 
 def _parse_box(s: str) -> List[int] | None:
     # accept formats like: [x0, y0, x1, y1]  or "x0,y0,x1,y1" or JSON
@@ -37,18 +39,36 @@ class BoxParser(Parser):
             return 1.0 if _parse_box(text) is not None else 0.0
         return _format_reward
 
+def _last_assistant_text(completion: Messages) -> str:
+    for msg in reversed(completion):
+        if msg.get("role") == "assistant":
+            return msg.get("content") or ""
+    return ""
+
 class ScreenSpotSingleTurn(vf.SingleTurnEnv):
     """
     One turn box prediction. The prompt is the instruction string.
     The rubric computes IoU plus a format reward.
     If the model fails to produce a box, we fall back to your baseline so evals still complete.
+    With async_scoring, IoU rewards are awaited through a BatchedScorer so fallback
+    predictions run in worker threads instead of blocking the rollout loop; call
+    close() when done with the environment to release its scorer threads.
     """
-    def __init__(self, examples: List[Dict[str, Any]], baseline: str = "text"):
+    def __init__(self, examples: List[Dict[str, Any]], baseline: str = "text",
+                 async_scoring: bool = False, score_batch_size: int = 32, score_workers: int = 8,
+                 fallback_cache_size: int = 4096):
         self.examples = examples
         self.baseline = baseline
+        self.fallback_memo = FallbackMemo(fallback_cache_size)
+        self.scorer = (
+            BatchedScorer(self._score_batch, max_batch=score_batch_size, max_workers=score_workers,
+                          key=lambda req: (req[0], req[1]["image_path"], tuple(req[1]["target_box"])))
+            if async_scoring else None
+        )
         parser = BoxParser()
+        iou_func = self._iou_reward_async if async_scoring else self._iou_reward
         # weights: IoU is primary, format reward as a small bonus
-        rubric = vf.Rubric(funcs=[self._iou_reward, parser.get_format_reward_func()], weights=[1.0, 0.1])
+        rubric = vf.Rubric(funcs=[iou_func, parser.get_format_reward_func()], weights=[1.0, 0.1])
         super().__init__(dataset=self._to_hf_dataset(examples), rubric=rubric, parser=parser)
 
     def _to_hf_dataset(self, examples: List[Dict[str, Any]]):
@@ -66,30 +86,57 @@ class ScreenSpotSingleTurn(vf.SingleTurnEnv):
         return Dataset.from_dict(data)
 
     def _predict_fallback(self, ex: Dict[str, Any]) -> List[int]:
+        # memoized per (image, baseline, instruction); the file's size and mtime
+        # are part of the key so an edited screenshot is never served stale
+        try:
+            st = os.stat(ex["image_path"])
+            stamp = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            return self._predict_fallback_uncached(ex)
+        key = (ex["image_path"], self.baseline, ex["instruction"], stamp)
+        return self.fallback_memo.get_or_compute(key, lambda: self._predict_fallback_uncached(ex))
+
+    def _predict_fallback_uncached(self, ex: Dict[str, Any]) -> List[int]:
         from PIL import Image
-        img = Image.open(ex["image_path"]).convert("RGB")
+        model = BASELINES[self.baseline]
+        if needs_pixels(model):
+            img = Image.open(ex["image_path"]).convert("RGB")
+        else:
+            # header only: size-only baselines never touch the pixels
+            with Image.open(ex["image_path"]) as im:
+                img = ImageSize(*im.size)
         priors_path = ""
-        instr = ex["instruction"]
-        if self.baseline == "text":
-            return text_rule.predict_box(img, instr, priors_path)
-        return region_search.predict_box(img, instr, priors_path)
+        return model.predict(img, ex["instruction"], priors_path).box
 
-    def _iou_reward(self, *, completion: Messages, info: Dict[str, Any], **kwargs) -> float:
-        # extract model box
-        model_text = ""
-        for msg in reversed(completion):
-            if msg.get("role") == "assistant":
-                model_text = msg.get("content") or ""
-                break
+    def _score_one(self, model_text: str, info: Dict[str, Any]) -> float:
         box = _parse_box(model_text)
         if box is None:
             # fallback to baseline so vf-eval completes predictably on smoke runs
             box = self._predict_fallback({"instruction": "", "image_path": info["image_path"]})
         return iou_score(box, info["target_box"])
 
-def load_environment(*, annotations: str, root: str = ".", subset: int = 4, max_resolution: int = 1200, baseline: str = "text", **kwargs):
+    def _score_batch(self, reqs: List[Tuple[str, Dict[str, Any]]]) -> List[float]:
+        # runs in a scorer thread; the scorer has already dropped duplicates
+        return [self._score_one(text, info) for text, info in reqs]
+
+    def _iou_reward(self, *, completion: Messages, info: Dict[str, Any], **kwargs) -> float:
+        return self._score_one(_last_assistant_text(completion), info)
+
+    async def _iou_reward_async(self, *, completion: Messages, info: Dict[str, Any], **kwargs) -> float:
+        return await self.scorer.score(_last_assistant_text(completion), info)
+
+    def close(self) -> None:
+        if self.scorer is not None:
+            self.scorer.close()
+
+def load_environment(*, annotations: str, root: str = ".", subset: int = 4, max_resolution: int = 1200,
+                     baseline: str = "text",
+                     async_scoring: bool = False, score_batch_size: int = 32, score_workers: int = 8,
+                     fallback_cache_size: int = 4096, **kwargs):
     """
     Entrypoint required by verifiers. Creates a SingleTurnEnv over your examples.
     """
     examples = load_examples(annotations_path=annotations, root=root, subset=subset, max_resolution=max_resolution)
-    return ScreenSpotSingleTurn(examples=examples, baseline=baseline)
+    return ScreenSpotSingleTurn(examples=examples, baseline=baseline, async_scoring=async_scoring,
+                                score_batch_size=score_batch_size, score_workers=score_workers,
+                                fallback_cache_size=fallback_cache_size)
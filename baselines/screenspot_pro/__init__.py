@@ -0,0 +1,16 @@
+from . import layout, region_search, text_rule
+from .common import ImageSize, Prediction
+
+BASELINES = {"layout": layout, "region": region_search, "text": text_rule}
+
+
+def get_baseline(name: str):
+    return BASELINES[name]
+
+
+def needs_pixels(baseline) -> bool:
+    # Baselines opt out of decoding by setting NEEDS_PIXELS = False.
+    return getattr(baseline, "NEEDS_PIXELS", True)
+
+
+__all__ = ["BASELINES", "ImageSize", "Prediction", "get_baseline", "needs_pixels"]
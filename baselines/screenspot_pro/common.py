@@ -0,0 +1,53 @@
+from typing import List, Tuple
+
+
+class ImageSize:
+    """Geometry-only stand-in for a PIL image.
+
+    Baselines with ``NEEDS_PIXELS = False`` only read ``size``/``width``/``height``,
+    so callers can hand them one of these built from the image header instead
+    of a decoded image.
+    """
+
+    __slots__ = ("size",)
+
+    def __init__(self, W: int, H: int):
+        self.size: Tuple[int, int] = (int(W), int(H))
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    def __repr__(self):
+        return f"ImageSize({self.size[0]}, {self.size[1]})"
+
+
+def size_of(image_or_size) -> Tuple[int, int]:
+    # accepts a PIL image, an ImageSize, or a plain (W, H) pair
+    if isinstance(image_or_size, (tuple, list)):
+        W, H = image_or_size
+        return int(W), int(H)
+    return image_or_size.size
+
+
+class Prediction:
+    """Box and confidence from one baseline call (``key`` names the rule that fired)."""
+
+    __slots__ = ("box", "confidence", "key")
+
+    def __init__(self, box: List[int], confidence: float, key: str = ""):
+        self.box = box
+        self.confidence = confidence
+        self.key = key
+
+    def __eq__(self, other):
+        if not isinstance(other, Prediction):
+            return NotImplemented
+        return (self.box, self.confidence, self.key) == (other.box, other.confidence, other.key)
+
+    def __repr__(self):
+        return f"Prediction(box={self.box}, confidence={self.confidence}, key={self.key!r})"
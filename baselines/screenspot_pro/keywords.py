@@ -0,0 +1,22 @@
+from typing import FrozenSet, Iterable
+
+
+class KeywordMatcher:
+    """Finds which keywords of a fixed set occur as substrings of a text.
+
+    Built once per keyword table. This is not a compiled single-pass scan:
+    ``find`` does one C-level substring search per keyword
+    (``str.__contains__``), which in CPython beats both a lookahead regex over
+    the alternation and a pure-Python Aho-Corasick walk for
+    instruction-length strings. Overlapping keywords ("toolbar", "tool",
+    "bar") are all reported, exactly like a chain of ``in`` checks. Matching
+    is case sensitive; callers pass a lowercased instruction.
+    """
+
+    __slots__ = ("keywords",)
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+
+    def find(self, text: str) -> FrozenSet[str]:
+        return frozenset(filter(text.__contains__, self.keywords))
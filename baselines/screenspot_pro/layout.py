@@ -0,0 +1,246 @@
+import threading
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from . import region_search, text_rule
+from .common import Prediction, size_of
+
+# Reads the pixels. The green plane is pulled out of the image once (half
+# the cost of a full RGB array, and contiguous for the profile passes); red
+# is only looked at inside candidate crops.
+NEEDS_PIXELS = True
+
+# Target outlines in the mocks are drawn in (220, 60, 60); after a BILINEAR
+# downscale their edge pixels blend toward the light UI fills, hence the
+# loose green bound. Dark text also passes _DARK_G but fails _RED_R.
+_RED_R = 170
+_DARK_G = 160
+# Largest green-level step between neighbouring rows/columns of one band.
+_FLAT = 2
+_MIN_OUTLINE = 0.3
+# Above this many pixels the coarse pass samples every other row and column.
+# A rectangle outline always survives: its horizontal edges span every
+# column and its vertical edges every row.
+_COARSE_PIXELS = 2_500_000
+
+
+def _runs(flags: np.ndarray, gap: int = 0) -> List[Tuple[int, int]]:
+    """[start, stop) runs of True in a 1-D bool array; runs <= ``gap`` apart merge."""
+    padded = np.concatenate(([False], flags, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, stops = edges[0::2], edges[1::2]
+    if gap and len(starts) > 1:
+        new = np.concatenate(([True], starts[1:] - stops[:-1] > gap))
+        starts = starts[new]
+        stops = np.concatenate((stops[:-1][new[1:]], stops[-1:]))
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def _segments(profile: np.ndarray, min_len: int) -> List[Tuple[int, int, int]]:
+    # (start, stop, level) runs of near-constant level; shorter runs are the
+    # blurred transitions between bands and are dropped
+    steps = np.abs(np.diff(profile.astype(np.int16))) > _FLAT
+    bounds = np.concatenate(([0], np.flatnonzero(steps) + 1, [len(profile)]))
+    return [
+        (a, b, int(profile[a]))
+        for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+        if b - a >= min_len
+    ]
+
+
+def find_bands(green: np.ndarray) -> Dict[str, List[int]]:
+    """Locate menu/toolbar/status bands and the sidebar from projection profiles.
+
+    The row profile is the per-row max of the green channel over the right
+    three quarters of the screen (max ignores dark text and red outlines);
+    the background is the level covering the most rows. Bands above it are
+    menu then toolbar, the last band below it is status; the column profile
+    of the background rows then gives the sidebar.
+    """
+    H, W = green.shape
+    rows = _segments(green[:, W // 4 :: 4].max(axis=1), max(2, H // 200))
+    if not rows:
+        return {}
+    bg = max(rows, key=lambda s: s[1] - s[0])[2]
+    body = [i for i, s in enumerate(rows) if s[2] == bg]
+    first, last = body[0], body[-1]
+    bands: Dict[str, List[int]] = {}
+    for name, (a, b, _) in zip(("menu", "toolbar"), rows[:first]):
+        bands[name] = [0, a, W, b]
+    if last + 1 < len(rows):
+        a, b, _ = rows[-1]
+        bands["status"] = [0, a, W, b]
+
+    top, bottom = rows[first][0], rows[last][1]
+    cols = _segments(green[top:bottom:4].max(axis=0), max(2, W // 200))
+    if cols and cols[0][0] <= 2 and cols[0][2] != bg:
+        bands["sidebar"] = [0, top, cols[0][1], bottom]
+    return bands
+
+
+def _box_sum(sat: np.ndarray, y0: int, x0: int, y1: int, x1: int) -> int:
+    # sum over rows [y0, y1) and columns [x0, x1) of the summed-area table's source
+    return int(sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0])
+
+
+def _outline_score(red: np.ndarray) -> float:
+    """Red density on a 2px border ring minus density inside it, via a summed-area table."""
+    h, w = red.shape
+    if h < 6 or w < 6:
+        return 0.0
+    sat = np.zeros((h + 1, w + 1), dtype=np.int32)
+    np.cumsum(np.cumsum(red, axis=0, dtype=np.int32), axis=1, out=sat[1:, 1:])
+    t = 2
+    total = _box_sum(sat, 0, 0, h, w)
+    inner = _box_sum(sat, t, t, h - t, w - t)
+    inner_area = (h - 2 * t) * (w - 2 * t)
+    ring = (total - inner) / float(h * w - inner_area)
+    return ring - inner / float(inner_area)
+
+
+def find_outlines(image: Image.Image, green: np.ndarray) -> List[Tuple[List[int], float]]:
+    """Candidate outlined boxes as ([x0, y0, x1, y1], outline score).
+
+    A coarse mask of dark pixels is cut into blocks by its row and column
+    projections (XY-cut); each block is then re-checked at full resolution
+    for red pixels, whose extent is the candidate box.
+    """
+    H, W = green.shape
+    s = 2 if H * W > _COARSE_PIXELS else 1
+    dark = green[::s, ::s] < _DARK_G
+    out = []
+    for y0, y1 in _runs(dark.any(axis=1), gap=2):
+        for x0, x1 in _runs(dark[y0:y1].any(axis=0), gap=2):
+            X0, Y0 = max(0, (x0 - 1) * s), max(0, (y0 - 1) * s)
+            X1, Y1 = min(W, (x1 + 1) * s), min(H, (y1 + 1) * s)
+            crop = np.asarray(image.crop((X0, Y0, X1, Y1)))
+            red = (crop[..., 0] > _RED_R) & (crop[..., 1] < _DARK_G)
+            ys = np.flatnonzero(red.any(axis=1))
+            if not len(ys):
+                continue
+            xs = np.flatnonzero(red.any(axis=0))
+            red = red[ys[0] : ys[-1] + 1, xs[0] : xs[-1] + 1]
+            box = [X0 + int(xs[0]), Y0 + int(ys[0]), X0 + int(xs[-1]), Y0 + int(ys[-1])]
+            out.append((box, _outline_score(red)))
+    return out
+
+
+def _band_of(box: List[int], bands: Dict[str, List[int]]) -> Optional[str]:
+    cx, cy = (box[0] + box[2]) / 2.0, (box[1] + box[3]) / 2.0
+    for name, (x0, y0, x1, y1) in bands.items():
+        if x0 <= cx < x1 and y0 <= cy < y1:
+            return name
+    return None
+
+
+# Analyses of live images, keyed by id() (PIL images are unhashable): every
+# instruction of a screenshot is run against the same image object, so the
+# analysis is done once per image. It costs about 1.3 ms at 1200x675, 3.3 ms
+# at 1920x1080 and 12-13.5 ms at 3840x2160, roughly two thirds of it pulling
+# out the green plane; later instructions only pay the lookup. A weakref finalizer drops the entry when
+# the image is collected, so nothing outlives its screenshot; the lock makes
+# this safe for the adapter's scorer threads.
+_ANALYSES: Dict[int, Tuple] = {}
+_ANALYSES_LOCK = threading.Lock()
+
+
+def _forget(key: int) -> None:
+    with _ANALYSES_LOCK:
+        _ANALYSES.pop(key, None)
+
+
+def _analyze(image: Image.Image):
+    key = id(image)
+    with _ANALYSES_LOCK:
+        hit = _ANALYSES.get(key)
+    if hit is not None:
+        return hit
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    green = np.asarray(rgb.getchannel("G"))
+    result = (find_bands(green), find_outlines(rgb, green))
+    with _ANALYSES_LOCK:
+        # two threads may race to analyse one image; the first result is kept
+        if key not in _ANALYSES:
+            _ANALYSES[key] = result
+            weakref.finalize(image, _forget, key)
+        return _ANALYSES[key]
+
+
+def predict(image, instruction: str, priors_path: str) -> Prediction:
+    if not isinstance(image, Image.Image):
+        # only a size to go on
+        return text_rule.predict(image, instruction, priors_path)
+    bands, outlines = _analyze(image)
+    scores = region_search._score_priors(instruction)
+    best, best_score, best_band = None, 0.0, None
+    for box, outline in outlines:
+        if outline < _MIN_OUTLINE:
+            continue
+        band = _band_of(box, bands)
+        score = outline + scores.get(band, 0)
+        if best is None or score > best_score:
+            best, best_score, best_band = box, score, band
+    if best is None:
+        return text_rule.predict(size_of(image), instruction, priors_path)
+    matched = best_band is not None and scores.get(best_band, 0) > 0
+    return Prediction(best, 0.9 if matched else 0.75, best_band or "outline")
+
+
+def predict_pyramid(pyramid, instruction: str, priors_path: str, overview: int = 1280) -> Prediction:
+    """``predict`` on a multi-scale pyramid; the box is in original pixels.
+
+    Bands and candidate outlines come from the overview level, so tiny
+    targets on 4K screens are found without analysing every full-res pixel;
+    each candidate is then re-measured on a full-resolution tile around it.
+    """
+    scores = region_search._score_priors(instruction)
+    level = pyramid.level_for(overview)
+    bands = {}
+
+    def propose(im):
+        coarse_bands, outlines = _analyze(im)
+        bands.update(coarse_bands)
+        return [(box, outline + scores.get(_band_of(box, coarse_bands), 0)) for box, outline in outlines]
+
+    def refine(tile):
+        green = np.asarray(tile.getchannel("G"))
+        outlines = [c for c in find_outlines(tile, green) if c[1] >= _MIN_OUTLINE]
+        return max(outlines, key=lambda c: c[1]) if outlines else None
+
+    found = pyramid.search(propose, refine, overview)
+    # band ends are exclusive, so they scale without the inclusive-corner fix-up
+    W, H = pyramid.size
+    bands = {
+        name: [x0 << level, y0 << level, min(W, x1 << level), min(H, y1 << level)]
+        for name, (x0, y0, x1, y1) in bands.items()
+    }
+    best, best_score, best_band = None, 0.0, None
+    for box, outline in found:
+        if outline < _MIN_OUTLINE:
+            continue
+        band = _band_of(box, bands)
+        score = outline + scores.get(band, 0)
+        if best is None or score > best_score:
+            best, best_score, best_band = box, score, band
+    if best is None:
+        return text_rule.predict(pyramid.size, instruction, priors_path)
+    matched = best_band is not None and scores.get(best_band, 0) > 0
+    return Prediction(best, 0.9 if matched else 0.75, best_band or "outline")
+
+
+def predict_many(
+    images: Sequence[Image.Image], instructions: Sequence[str], priors_path: str
+) -> List[Prediction]:
+    # consecutive rows on the same image reuse one analysis via _analyze
+    return [predict(im, ins, priors_path) for im, ins in zip(images, instructions)]
+
+
+def predict_box(image: Image.Image, instruction: str, priors_path: str) -> List[int]:
+    return predict(image, instruction, priors_path).box
+
+
+def predict_confidence(image: Image.Image, instruction: str, priors_path: str) -> float:
+    return predict(image, instruction, priors_path).confidence
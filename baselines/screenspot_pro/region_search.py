@@ -1,17 +1,47 @@
 import json
-from typing import Dict, List
+import os
+import stat
+from typing import Dict, List, Sequence, Tuple
 
 from PIL import Image
 
-_PRIORS_CACHE = None
+from .common import Prediction, size_of
+from .keywords import KeywordMatcher
 
+# Only image.size is read, so callers may pass an ImageSize instead of pixels.
+NEEDS_PIXELS = False
 
-def _load_priors(p: str) -> Dict[str, List[float]]:
-    global _PRIORS_CACHE
-    if _PRIORS_CACHE is None:
-        with open(p, "r", encoding="utf-8") as f:
-            _PRIORS_CACHE = json.load(f)
-    return _PRIORS_CACHE
+# Built-in copy of priors.json, used when the priors file does not exist.
+_DEFAULT_PRIORS: Dict[str, Tuple[float, float, float, float]] = {
+    "menu": (0.00, 0.00, 0.20, 0.05),
+    "toolbar": (0.00, 0.05, 1.00, 0.12),
+    "sidebar": (0.00, 0.12, 0.12, 0.92),
+    "status": (0.00, 0.92, 1.00, 1.00),
+}
+
+# resolved path -> ((mtime_ns, size), parsed priors)
+_PRIORS_REGISTRY: Dict[str, Tuple[Tuple[int, int], Dict[str, Tuple[float, ...]]]] = {}
+
+
+def _load_priors(p: str) -> Dict[str, Tuple[float, ...]]:
+    # Keyed by resolved path and invalidated when the file changes, so one warm
+    # process can serve several priors files without re-parsing per call.
+    try:
+        path = os.path.realpath(p)
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return _DEFAULT_PRIORS
+    if not stat.S_ISREG(st.st_mode):
+        return _DEFAULT_PRIORS
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _PRIORS_REGISTRY.get(path)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    priors = {k: tuple(float(v) for v in rel) for k, rel in raw.items()}
+    _PRIORS_REGISTRY[path] = (stamp, priors)
+    return priors
 
 
 def _to_abs(box_rel, W, H):
@@ -19,35 +49,85 @@ def _to_abs(box_rel, W, H):
     return [int(x0 * W), int(y0 * H), int(x1 * W), int(y1 * H)]
 
 
+# simple keyword hit count per prior
+_HITS = {
+    "menu": ("file", "edit", "view", "menu"),
+    "toolbar": ("tool", "icon", "button", "ribbon", "bar"),
+    "sidebar": ("sidebar", "panel", "left", "nav"),
+    "status": ("status", "bottom", "progress"),
+}
+_HIT_SETS = {k: frozenset(v) for k, v in _HITS.items()}
+_MATCHER = KeywordMatcher(w for words in _HITS.values() for w in words)
+
+
+_SCORES_BY_FOUND: Dict[frozenset, Dict[str, int]] = {}
+
+
+def _score_priors(instruction: str) -> Dict[str, int]:
+    # One pass over the instruction scores every prior at once. The returned
+    # dict is shared between calls with the same keyword set; do not mutate it.
+    found = _MATCHER.find(instruction.lower())
+    scores = _SCORES_BY_FOUND.get(found)
+    if scores is None:
+        scores = {k: len(found & words) for k, words in _HIT_SETS.items()}
+        _SCORES_BY_FOUND[found] = scores
+    return scores
+
+
 def _score_prior(key: str, instruction: str) -> int:
-    # simple keyword hit count
-    hits = {
-        "menu": ["file", "edit", "view", "menu"],
-        "toolbar": ["tool", "icon", "button", "ribbon", "bar"],
-        "sidebar": ["sidebar", "panel", "left", "nav"],
-        "status": ["status", "bottom", "progress"],
-    }
-    words = hits.get(key, [])
-    ins = instruction.lower()
-    return sum(1 for w in words if w in ins)
+    return _score_priors(instruction).get(key, 0)
 
 
 def best_prior_box(instruction: str, priors_path: str, W: int, H: int):
     pri = _load_priors(priors_path)
+    scores = _score_priors(instruction)
     scored = []
     for k, rel in pri.items():
-        score = _score_prior(k, instruction)
-        scored.append((score, k, _to_abs(rel, W, H)))
+        scored.append((scores.get(k, 0), k, _to_abs(rel, W, H)))
     scored.sort(reverse=True)
     return scored[0] if scored else (0, "toolbar", [0, 0, W, H])
 
 
-def predict_box(image: Image.Image, instruction: str, priors_path: str) -> List[int]:
-    W, H = image.size
+def _confidence(score: int) -> float:
+    return min(1.0, 0.25 * max(0, score))
+
+
+def predict(image_or_size, instruction: str, priors_path: str) -> Prediction:
+    W, H = size_of(image_or_size)
     score, key, box = best_prior_box(instruction, priors_path, W, H)
-    return box
+    return Prediction(box, _confidence(score), key)
+
+
+def predict_many(
+    sizes: Sequence[Tuple[int, int]], instructions: Sequence[str], priors_path: str
+) -> List[Prediction]:
+    # The winning prior depends only on the instruction (keys are unique, so
+    # best_prior_box never breaks ties on the box), and its box only on the
+    # size: both are computed once per distinct value.
+    pri = _load_priors(priors_path)
+    best: Dict[str, Tuple[int, str]] = {}
+    boxes: Dict[Tuple[str, int, int], List[int]] = {}
+    out = []
+    for size, ins in zip(sizes, instructions):
+        W, H = size_of(size)
+        if not pri:
+            out.append(Prediction([0, 0, W, H], _confidence(0), "toolbar"))
+            continue
+        sk = best.get(ins)
+        if sk is None:
+            scores = _score_priors(ins)
+            sk = best[ins] = max((scores.get(k, 0), k) for k in pri)
+        score, key = sk
+        box = boxes.get((key, W, H))
+        if box is None:
+            box = boxes[(key, W, H)] = _to_abs(pri[key], W, H)
+        out.append(Prediction(list(box), _confidence(score), key))
+    return out
+
+
+def predict_box(image: Image.Image, instruction: str, priors_path: str) -> List[int]:
+    return predict(image, instruction, priors_path).box
 
 
 def predict_confidence(image: Image.Image, instruction: str, priors_path: str) -> float:
-    score, _, _ = best_prior_box(instruction, priors_path, image.width, image.height)
-    return min(1.0, 0.25 * max(0, score))
+    return predict(image, instruction, priors_path).confidence
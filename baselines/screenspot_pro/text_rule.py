@@ -1,8 +1,13 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 from PIL import Image
 
 from . import region_search
+from .common import Prediction, size_of
+
+# Only image.size is read, so callers may pass an ImageSize instead of pixels.
+NEEDS_PIXELS = False
 
 # Exact keyword anchors taken from how mocks were drawn.
 # They are in a "1080p baseline" pixel space and we scale by s = H/1080.
@@ -56,32 +61,113 @@ def _status_box(W: int, H: int) -> List[int]:
     return [x0, y0, x1, y1]
 
 
-def _keyword_box(W: int, H: int, instruction: str) -> Tuple[Optional[List[int]], float]:
+# Anchor keywords in priority order, with the confidence each one carries.
+_ANCHOR_CONF = (("file", 0.95), ("save", 0.95), ("sidebar", 0.90), ("status", 0.90))
+
+
+# Row order of the anchor matrix. "status" holds the 1080p insets from the
+# bottom-right corner used by _status_box; the others are absolute 1080p boxes.
+_ANCHOR_KEYS = tuple(k for k, _ in _ANCHOR_CONF)
+_ANCHOR_ROW = {k: i for i, k in enumerate(_ANCHOR_KEYS)}
+_ANCHOR_MATRIX = np.array(
+    [_ANCHORS_1080[k] if k != "status" else (180, 60, 40, 10) for k in _ANCHOR_KEYS],
+    dtype=np.float64,
+)
+_STATUS_ROW = _ANCHOR_ROW["status"]
+
+
+def anchor_boxes_batch(W, H) -> np.ndarray:
+    """Scale every anchor to N screen sizes at once: (N,) W/H -> (N, K, 4) int64.
+
+    Bit-exact with _scale_box/_status_box: same float64 scale, round-half-even
+    (np.rint == round), clamping and corner swap.
+    """
+    W = np.asarray(W, dtype=np.int64).reshape(-1, 1)
+    H = np.asarray(H, dtype=np.int64).reshape(-1, 1)
+    s = H / 1080.0
+    v = np.rint(_ANCHOR_MATRIX[None, :, :] * s[:, :, None]).astype(np.int64)
+    x0 = np.maximum(0, np.minimum(W - 1, v[..., 0]))
+    y0 = np.maximum(0, np.minimum(H - 1, v[..., 1]))
+    x1 = np.maximum(0, np.minimum(W, v[..., 2]))
+    y1 = np.maximum(0, np.minimum(H, v[..., 3]))
+    st = v[:, _STATUS_ROW]
+    x0[:, _STATUS_ROW] = np.maximum(0, W[:, 0] - st[:, 0])
+    y0[:, _STATUS_ROW] = np.maximum(0, H[:, 0] - st[:, 1])
+    x1[:, _STATUS_ROW] = np.maximum(0, W[:, 0] - st[:, 2])
+    y1[:, _STATUS_ROW] = np.maximum(0, H[:, 0] - st[:, 3])
+    return np.stack(
+        [np.minimum(x0, x1), np.minimum(y0, y1), np.maximum(x0, x1), np.maximum(y0, y1)],
+        axis=-1,
+    )
+
+
+def _route(instruction: str) -> Tuple[Optional[str], float]:
+    # First hit wins, so a short-circuiting scan beats matching every anchor.
     ins = instruction.lower()
-    if "file" in ins:
-        return _scale_box(_ANCHORS_1080["file"], W, H), 0.95
-    if "save" in ins:
-        return _scale_box(_ANCHORS_1080["save"], W, H), 0.95
-    if "sidebar" in ins:
-        return _scale_box(_ANCHORS_1080["sidebar"], W, H), 0.90
-    if "status" in ins:
-        return _status_box(W, H), 0.90
+    for key, conf in _ANCHOR_CONF:
+        if key in ins:
+            return key, conf
     return None, 0.0
 
 
+def _anchor_box(key: str, W: int, H: int) -> List[int]:
+    if key == "status":
+        return _status_box(W, H)
+    return _scale_box(_ANCHORS_1080[key], W, H)
+
+
+def _keyword_box(W: int, H: int, instruction: str) -> Tuple[Optional[List[int]], float]:
+    key, conf = _route(instruction)
+    if key is None:
+        return None, 0.0
+    return _anchor_box(key, W, H), conf
+
+
+def predict(image_or_size, instruction: str, priors_path: str) -> Prediction:
+    W, H = size_of(image_or_size)
+    key, conf = _route(instruction)
+    if key is None:
+        # fallback to coarse region prior
+        return region_search.predict((W, H), instruction, priors_path)
+    return Prediction(_anchor_box(key, W, H), conf, key)
+
+
+def predict_many(
+    sizes: Sequence[Tuple[int, int]], instructions: Sequence[str], priors_path: str
+) -> List[Prediction]:
+    routes: Dict[str, Tuple[Optional[str], float]] = {}
+    out: List[Optional[Prediction]] = [None] * len(instructions)
+    routed, fallback_rows = [], []
+    size_ids: Dict[Tuple[int, int], int] = {}
+    for i, (size, ins) in enumerate(zip(sizes, instructions)):
+        route = routes.get(ins)
+        if route is None:
+            route = routes[ins] = _route(ins)
+        if route[0] is None:
+            fallback_rows.append(i)
+            continue
+        wh = size_of(size)
+        routed.append((i, route, size_ids.setdefault(wh, len(size_ids))))
+    if routed:
+        # every anchor for every distinct size in one NumPy pass
+        uniq = np.array(list(size_ids), dtype=np.int64).reshape(-1, 2)
+        table = anchor_boxes_batch(uniq[:, 0], uniq[:, 1]).tolist()
+        for i, (key, conf), sid in routed:
+            out[i] = Prediction(table[sid][_ANCHOR_ROW[key]], conf, key)
+    if fallback_rows:
+        preds = region_search.predict_many(
+            [size_of(sizes[i]) for i in fallback_rows],
+            [instructions[i] for i in fallback_rows],
+            priors_path,
+        )
+        for i, p in zip(fallback_rows, preds):
+            out[i] = p
+    return out
+
+
 def predict_box(image: Image.Image, instruction: str, priors_path: str) -> List[int]:
-    W, H = image.size
-    kb, _ = _keyword_box(W, H, instruction)
-    if kb is not None:
-        return kb
-    # fallback to coarse region prior
-    return region_search.predict_box(image, instruction, priors_path)
+    return predict(image, instruction, priors_path).box
 
 
 def predict_confidence(image: Image.Image, instruction: str, priors_path: str) -> float:
-    W, H = image.size
-    kb, conf = _keyword_box(W, H, instruction)
-    if kb is not None:
-        return conf
-    # fallback confidence based on region keyword hits
-    return region_search.predict_confidence(image, instruction, priors_path)
+    return predict(image, instruction, priors_path).confidence
@@ -0,0 +1,215 @@
+"""Stage-by-stage throughput/latency benchmark for the eval pipeline.
+
+Generates a synthetic dataset with tools/make_more_mocks.mk, then times each
+stage of the envs.screenspot_pro.eval hot path separately (annotation parse,
+image decode, resize, predict, score, serialize) and reports p50/p95/p99 and
+examples/sec as JSON.
+
+    PYTHONPATH=. python -m benchmarks.pipeline --images 40 --resolutions 1920x1080,3840x2160 \
+        --out bench.json
+    PYTHONPATH=. python -m benchmarks.pipeline --compare bench.json --tolerance 0.2
+
+With --compare the run exits non-zero if any stage's p50 (or overall
+examples/sec) is worse than the stored baseline by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from baselines.screenspot_pro import BASELINES, needs_pixels
+from envs.screenspot_pro.dataset import _target_size, load_jsonl, safe_image_size
+from envs.screenspot_pro.metrics import center_in_box
+from tools.make_more_mocks import mk, target_for
+
+STAGES = ("parse", "decode", "resize", "predict", "score", "serialize")
+
+
+def _resolutions(spec: str) -> List[Tuple[int, int]]:
+    out = []
+    for part in spec.split(","):
+        w, h = part.lower().split("x")
+        out.append((int(w), int(h)))
+    return out
+
+
+def make_dataset(
+    out_dir: str, images: int, resolutions: List[Tuple[int, int]], per_image: int = 1
+) -> str:
+    """Write ``images`` mock screenshots cycling through ``resolutions``; return the jsonl."""
+    ann = os.path.join(out_dir, "annotations.jsonl")
+    with open(ann, "w", encoding="utf-8") as f:
+        for i in range(images):
+            W, H = resolutions[i % len(resolutions)]
+            gold, _, inst = target_for(i, W, H)
+            path = os.path.join(out_dir, f"bench_{i}.png")
+            mk(path, W, H, gold, inst)
+            for j in range(per_image):
+                gold, tt, inst = target_for(i + j, W, H)
+                row = {"image_path": path, "instruction": inst, "bbox": gold, "target_type": tt}
+                f.write(json.dumps(row) + "\n")
+    return ann
+
+
+def _percentiles(xs: List[float]) -> Dict[str, float]:
+    if not xs:
+        return {"count": 0}
+    s = sorted(xs)
+
+    def pct(p):
+        return 1000.0 * s[min(len(s) - 1, int(round(p * (len(s) - 1))))]
+
+    return {
+        "count": len(s),
+        "mean_ms": 1000.0 * sum(s) / len(s),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "total_s": sum(s),
+    }
+
+
+def run(
+    ann: str,
+    baseline: str,
+    max_resolution: Optional[int],
+    priors: str,
+    force_decode: bool = False,
+) -> Dict:
+    times: Dict[str, List[float]] = {k: [] for k in STAGES}
+    clock = time.perf_counter
+
+    t0 = clock()
+    records = load_jsonl(ann)
+    parse_s = clock() - t0
+    # parse is one pass over the file; report it per record for comparability
+    times["parse"] = [parse_s / max(1, len(records))] * len(records)
+
+    model = BASELINES[baseline]
+    pixels = force_decode or needs_pixels(model)
+    t_all = clock()
+    for r in records:
+        t = clock()
+        if pixels:
+            im = Image.open(r["image_path"]).convert("RGB")
+            t1 = clock()
+            size, scale = _target_size(im.width, im.height, max_resolution)
+            if scale != 1.0:
+                im = im.resize(size, Image.BILINEAR)
+            t2 = clock()
+        else:
+            im, _, scale = safe_image_size(r["image_path"], max_resolution)
+            t1 = t2 = clock()
+        times["decode"].append(t1 - t)
+        times["resize"].append(t2 - t1)
+
+        t = clock()
+        pred = model.predict(im, r["instruction"], priors)
+        times["predict"].append(clock() - t)
+
+        t = clock()
+        gold = [int(v * scale) for v in r["bbox"]] if scale != 1.0 else r["bbox"]
+        W, H = im.size
+        success = center_in_box(pred.box, gold, W, H)
+        times["score"].append(clock() - t)
+
+        t = clock()
+        json.dumps(
+            {
+                "image_path": r["image_path"],
+                "instruction": r["instruction"],
+                "pred_box": pred.box,
+                "gold_box": gold,
+                "target_type": r["target_type"],
+                "W": W,
+                "H": H,
+                "success": success,
+                "confidence": float(pred.confidence),
+                "scale": scale,
+            }
+        )
+        times["serialize"].append(clock() - t)
+    wall = clock() - t_all + parse_s
+
+    return {
+        "examples": len(records),
+        "examples_per_s": len(records) / wall if wall else None,
+        "wall_time_s": wall,
+        "stages": {k: _percentiles(v) for k, v in times.items()},
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """Return regressions: stage p50 or examples/sec worse than baseline by > tolerance."""
+    out = []
+    for stage, stats in current["stages"].items():
+        ref = baseline.get("stages", {}).get(stage, {}).get("p50_ms")
+        cur = stats.get("p50_ms")
+        if ref and cur is not None and cur > ref * (1.0 + tolerance):
+            out.append({"metric": f"{stage}.p50_ms", "baseline": ref, "current": cur})
+    ref = baseline.get("examples_per_s")
+    cur = current.get("examples_per_s")
+    if ref and cur is not None and cur < ref / (1.0 + tolerance):
+        out.append({"metric": "examples_per_s", "baseline": ref, "current": cur})
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", type=int, default=20)
+    ap.add_argument("--per_image", type=int, default=1, help="instructions per screenshot")
+    ap.add_argument("--resolutions", type=_resolutions, default=_resolutions("1920x1080,3840x2160"))
+    ap.add_argument("--baseline", choices=sorted(BASELINES), default="text")
+    ap.add_argument("--max_resolution", type=int, default=1200)
+    ap.add_argument(
+        "--force_decode",
+        action="store_true",
+        help="decode pixels even when the baseline only needs the image size",
+    )
+    ap.add_argument("--data_dir", default=None, help="reuse/keep the generated dataset here")
+    ap.add_argument("--out", default=None, help="write the report JSON here")
+    ap.add_argument("--compare", default=None, help="baseline report to check against")
+    ap.add_argument("--tolerance", type=float, default=0.2)
+    args = ap.parse_args(argv)
+
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    priors = os.path.join(root, "baselines", "screenspot_pro", "priors.json")
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        ann = os.path.join(data_dir, "annotations.jsonl")
+        if not (args.data_dir and os.path.exists(ann)):
+            ann = make_dataset(data_dir, args.images, args.resolutions, args.per_image)
+        report = run(ann, args.baseline, args.max_resolution, priors, args.force_decode)
+
+    report["config"] = {
+        "images": args.images,
+        "per_image": args.per_image,
+        "resolutions": [f"{w}x{h}" for w, h in args.resolutions],
+        "baseline": args.baseline,
+        "max_resolution": args.max_resolution,
+        "force_decode": args.force_decode,
+        "python": platform.python_version(),
+    }
+    status = 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+        status = 1 if regressions else 0
+
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
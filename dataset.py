@@ -1,38 +1,22 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 
 from PIL import (
     Image,
 )  # noqa: F401  (import kept to allow callers to import dataset without PIL errors)
 
+from envs.screenspot_pro.writer import iter_json_values
 
-def _read_annotations(path: Path) -> List[Dict[str, Any]]:
+
+def _read_annotations(path: Path) -> Iterator[Dict[str, Any]]:
     """
-    Read either JSON Lines (one object per line) or a JSON array.
-    Returns a list of dicts.
+    Lazily yield records from either JSON Lines or a JSON array.
+    A caller that stops early never reads (or parses) the rest of the file.
     """
-    txt = path.read_text(encoding="utf-8").strip()
-    if not txt:
-        return []
-    # Try JSONL
-    lines = txt.splitlines()
-    try:
-        out = [json.loads(line) for line in lines if line.strip()]
-        # Heuristic: if more than one line parsed, treat as JSONL
-        if len(out) >= 1 and len(lines) > 1:
-            return out
-        # If single line JSONL, we will fall through to array parsing
-    except json.JSONDecodeError:
-        pass
-    # Try JSON array
-    arr = json.loads(txt)
-    if isinstance(arr, list):
-        return arr
-    # Single object
-    return [arr]
+    with path.open("r", encoding="utf-8") as f:
+        yield from iter_json_values(f)
 
 
 def _coerce_example(
@@ -74,7 +58,7 @@ def load_examples(
     """
     Load a tiny set of examples for smoke evals.
 
-    - Accepts JSONL or JSON array annotations
+    - Accepts JSONL or JSON array annotations, streamed lazily
     - Coerces fields and resolves image paths
     - Applies optional subset limit
     - max_resolution is accepted for signature parity (no resize here)
@@ -89,7 +73,7 @@ def load_examples(
         *ann_path.parts[ann_path.parts.index("data") : -1]
     )  # data/mock_screenspot_pro
 
-    raw = _read_annotations(ann_path)
+    raw = _read_annotations(ann_path)  # lazy: stops reading once subset is met
     out: List[Dict[str, Any]] = []
     for rec in raw:
         ex = _coerce_example(rec, root_path, dataset_rel_dir)
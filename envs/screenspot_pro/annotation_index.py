@@ -0,0 +1,162 @@
+import json
+import os
+import random
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .dataset import ScreenSpotRecord
+
+_VERSION = 1
+_TARGET_TYPES = ("text", "icon")
+
+
+def is_index(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, "meta.json"))
+
+
+def shard_bounds(n: int, shard_index: int, num_shards: int) -> Tuple[int, int]:
+    if not 0 <= shard_index < num_shards:
+        raise ValueError(f"shard {shard_index}/{num_shards} out of range")
+    return n * shard_index // num_shards, n * (shard_index + 1) // num_shards
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    # "i/n" -> (i, n)
+    try:
+        i, n = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"bad shard spec {spec!r}, expected i/n") from None
+    shard_bounds(0, i, n)
+    return i, n
+
+
+def _write_strings(out_dir: str, name: str, strings: List[str]) -> None:
+    blobs = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+    np.save(os.path.join(out_dir, f"{name}.offsets.npy"), offsets)
+    with open(os.path.join(out_dir, f"{name}.bin"), "wb") as f:
+        f.write(b"".join(blobs))
+
+
+def compile_index(records: Iterable[ScreenSpotRecord], out_dir: str) -> int:
+    """Compile validated records into a memory-mappable columnar index.
+
+    Boxes are int32 (N, 4), target_type is uint8, and instructions and image
+    paths are deduplicated into string tables referenced by int32 ids.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    boxes, ttypes, inst_ids, img_ids = [], [], [], []
+    inst_table: Dict[str, int] = {}
+    img_table: Dict[str, int] = {}
+    for r in records:
+        boxes.append(r["bbox"])
+        ttypes.append(_TARGET_TYPES.index(r["target_type"]))
+        inst_ids.append(inst_table.setdefault(r["instruction"], len(inst_table)))
+        img_ids.append(img_table.setdefault(r["image_path"], len(img_table)))
+    n = len(boxes)
+    np.save(
+        os.path.join(out_dir, "boxes.npy"),
+        np.asarray(boxes, dtype=np.int32).reshape(n, 4),
+    )
+    np.save(os.path.join(out_dir, "target_type.npy"), np.asarray(ttypes, dtype=np.uint8))
+    np.save(os.path.join(out_dir, "instruction_id.npy"), np.asarray(inst_ids, dtype=np.int32))
+    np.save(os.path.join(out_dir, "image_id.npy"), np.asarray(img_ids, dtype=np.int32))
+    _write_strings(out_dir, "instructions", list(inst_table))
+    _write_strings(out_dir, "images", list(img_table))
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": _VERSION, "count": n, "target_types": list(_TARGET_TYPES)}, f
+        )
+    return n
+
+
+class _StringTable:
+    __slots__ = ("offsets", "blob")
+
+    def __init__(self, index_dir: str, name: str):
+        self.offsets = np.load(os.path.join(index_dir, f"{name}.offsets.npy"), mmap_mode="r")
+        path = os.path.join(index_dir, f"{name}.bin")
+        if os.path.getsize(path):
+            self.blob = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            self.blob = np.zeros(0, dtype=np.uint8)
+
+    def __getitem__(self, i: int) -> str:
+        return self.blob[self.offsets[i] : self.offsets[i + 1]].tobytes().decode("utf-8")
+
+
+class AnnotationIndex:
+    """Memory-mapped view over a compiled annotation index.
+
+    Opening is O(1) regardless of dataset size; ``__getitem__`` decodes a
+    single record. Integer slices and ``shard`` return views over a
+    contiguous row range without copying.
+    """
+
+    def __init__(self, index_dir: str, _start: int = 0, _stop: Optional[int] = None):
+        with open(os.path.join(index_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != _VERSION:
+            raise ValueError(f"unsupported annotation index version: {meta.get('version')}")
+        self.index_dir = index_dir
+        self._types = meta["target_types"]
+        self._boxes = np.load(os.path.join(index_dir, "boxes.npy"), mmap_mode="r")
+        self._ttype = np.load(os.path.join(index_dir, "target_type.npy"), mmap_mode="r")
+        self._inst = np.load(os.path.join(index_dir, "instruction_id.npy"), mmap_mode="r")
+        self._img = np.load(os.path.join(index_dir, "image_id.npy"), mmap_mode="r")
+        self._instructions = _StringTable(index_dir, "instructions")
+        self._images = _StringTable(index_dir, "images")
+        self._start = _start
+        self._stop = meta["count"] if _stop is None else _stop
+
+    def _view(self, start: int, stop: int) -> "AnnotationIndex":
+        view = object.__new__(AnnotationIndex)
+        view.__dict__.update(self.__dict__)
+        view._start, view._stop = start, stop
+        return view
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                raise ValueError("AnnotationIndex slices must be contiguous")
+            return self._view(self._start + start, self._start + max(start, stop))
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        j = self._start + i
+        return {
+            "image_path": self._images[int(self._img[j])],
+            "instruction": self._instructions[int(self._inst[j])],
+            "bbox": [int(v) for v in self._boxes[j]],
+            "target_type": self._types[int(self._ttype[j])],
+        }
+
+    def __iter__(self) -> Iterator[ScreenSpotRecord]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __reduce__(self):
+        # pickles as (dir, range) so pool workers re-map instead of copying
+        return (AnnotationIndex, (self.index_dir, self._start, self._stop))
+
+    def shard(self, shard_index: int, num_shards: int) -> "AnnotationIndex":
+        start, stop = shard_bounds(len(self), shard_index, num_shards)
+        return self[start:stop]
+
+    def image_paths(self) -> List[str]:
+        """Image path of every row, decoding each distinct path once."""
+        ids, inverse = np.unique(self._img[self._start : self._stop], return_inverse=True)
+        names = [self._images[int(i)] for i in ids]
+        return [names[k] for k in inverse.tolist()]
+
+    def sample(self, k: int, seed: int = 0) -> List[ScreenSpotRecord]:
+        rows = random.Random(seed).sample(range(len(self)), min(k, len(self)))
+        return [self[i] for i in rows]
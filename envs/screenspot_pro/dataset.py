@@ -3,6 +3,8 @@ from typing import List, Optional, TypedDict
 
 from PIL import Image
 
+from baselines.screenspot_pro.common import ImageSize
+
 
 class ScreenSpotRecord(TypedDict):
     image_path: str
@@ -21,27 +23,95 @@ def _valid_box(b):
     )
 
 
-def safe_open_image(path: str, max_resolution: Optional[int] = None):
+# Modes Image.reduce() accepts; anything else is converted to RGB first.
+_REDUCIBLE_MODES = ("L", "LA", "RGB", "RGBA", "RGBX", "CMYK", "I", "F")
+
+
+def _target_size(w: int, h: int, max_resolution: Optional[int]):
+    scale = 1.0
+    if max_resolution:
+        m = max(w, h)
+        if m > max_resolution:
+            scale = max_resolution / float(m)
+    return (max(1, int(w * scale)), max(1, int(h * scale))), scale
+
+
+def _decode_reduced(im, size):
+    # JPEG decodes straight to a smaller DCT scale; other formats get a cheap
+    # integer box reduce before the RGB conversion and the final BILINEAR pass.
+    im.draft("RGB", size)
+    if im.mode not in _REDUCIBLE_MODES:
+        im = im.convert("RGB")
+    factor = min(im.width // size[0], im.height // size[1]) // 2
+    if factor > 1:
+        im = im.reduce(factor)
+    im = im.convert("RGB")
+    if im.size != size:
+        im = im.resize(size, Image.BILINEAR)
+    return im
+
+
+def safe_open_image(
+    path: str,
+    max_resolution: Optional[int] = None,
+    fast: bool = False,
+    cache=None,
+):
+    # cache: optional image_cache.ImageCache. Warm entries are memory-mapped
+    # arrays, so the decoder and resize are skipped entirely; fromarray only
+    # copies the mapped bytes into PIL's own buffer.
+    if cache is not None:
+        hit = cache.get(path, max_resolution, fast)
+        if hit is not None:
+            arr, scale = hit
+            return Image.fromarray(arr), None, scale
+    im, err, scale = _open_image(path, max_resolution, fast)
+    if cache is not None and err is None:
+        cache.put(path, max_resolution, im, scale, fast)
+    return im, err, scale
+
+
+def _open_image(path: str, max_resolution: Optional[int], fast: bool):
     try:
-        im = Image.open(path).convert("RGB")
+        im = Image.open(path)
+        size, scale = _target_size(im.width, im.height, max_resolution)
+        if fast and scale != 1.0:
+            return _decode_reduced(im, size), None, scale
+        im = im.convert("RGB")
     except FileNotFoundError:
         return None, f"file not found: {path}", 1.0
     except Image.UnidentifiedImageError:
         return None, f"unsupported format: {path}", 1.0
     except OSError as e:
         return None, f"os error: {e}", 1.0
-    scale = 1.0
-    if max_resolution:
-        w, h = im.size
-        m = max(w, h)
-        if m > max_resolution:
-            scale = max_resolution / float(m)
-            im = im.resize(
-                (max(1, int(w * scale)), max(1, int(h * scale))), Image.BILINEAR
-            )
+    if scale != 1.0:
+        im = im.resize(size, Image.BILINEAR)
     return im, None, scale
 
 
+def safe_image_size(path: str, max_resolution: Optional[int] = None, verify: bool = False):
+    # Header-only counterpart of safe_open_image for baselines that never look
+    # at pixels: Image.open parses just enough to know W and H, so a truncated
+    # or corrupt body goes unnoticed. verify=True also runs Image.verify(),
+    # which reads the whole file and checks its structure (PNG chunk CRCs,
+    # truncation) without decoding, so such files are skipped as they would
+    # be by safe_open_image.
+    try:
+        with Image.open(path) as im:
+            w, h = im.size
+            if verify:
+                im.verify()
+    except FileNotFoundError:
+        return None, f"file not found: {path}", 1.0
+    except Image.UnidentifiedImageError:
+        return None, f"unsupported format: {path}", 1.0
+    except (OSError, SyntaxError) as e:
+        # verify() reports a bad checksum as SyntaxError
+        return None, f"os error: {e}", 1.0
+    size, scale = _target_size(w, h, max_resolution)
+    return ImageSize(*size), None, scale
+
+
 def load_jsonl(p: str) -> List[ScreenSpotRecord]:
     out: List[ScreenSpotRecord] = []
     with open(p, "r", encoding="utf-8") as f:
@@ -1,28 +1,35 @@
 import argparse
+import functools
 import json
+import multiprocessing
+import multiprocessing.util
 import os
+import threading
 import time
-from typing import Dict, List
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from baselines.screenspot_pro import region_search, text_rule
+from PIL import Image
 
-from .dataset import load_jsonl, safe_open_image
-from .metrics import center_in_box, summarize
+from baselines.screenspot_pro import BASELINES, needs_pixels
 
+from .annotation_index import AnnotationIndex, is_index, parse_shard, shard_bounds
+from .dataset import load_jsonl, safe_image_size, safe_open_image
+from .image_cache import ImageCache
+from .instrument import NULL, Instrumentation
+from .metrics import SummaryAccumulator, center_in_box
+from .prefetch import Prefetcher
+from .pyramid import Pyramid, PyramidCache
+from .shm import SlabImage, SlabPool, write_image
+from .sharding import claim_units, open_plan, plan_shards, unit_output, unit_summary
+from .writer import JsonlWriter, _compression_for, iter_jsonl
 
-def _save_calibration_png(examples: List[Dict], out_path: str):
+
+def _save_calibration_png(totals: List[int], correct: List[int], out_path: str):
     try:
         import matplotlib.pyplot as plt
     except Exception:
         return
-    totals = [0] * 10
-    correct = [0] * 10
-    for ex in examples:
-        c = max(0.0, min(0.999, float(ex.get("confidence", 0.0))))
-        b = int(c * 10)
-        totals[b] += 1
-        if ex.get("success"):
-            correct[b] += 1
     xs = []
     ys = []
     for i in range(10):
@@ -41,85 +48,606 @@ def _save_calibration_png(examples: List[Dict], out_path: str):
     plt.close()
 
 
+def _resolve_image_path(r: Dict, root: str) -> str:
+    if os.path.isabs(r["image_path"]):
+        return r["image_path"]
+    return os.path.join(root, "data", "mock_screenspot_pro", r["image_path"])
+
+
+_CACHES: Dict[str, ImageCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def _get_cache(cache_dir: Optional[str], max_mb: int) -> Optional[ImageCache]:
+    # one ImageCache per process; pool workers flush their index on exit
+    if not cache_dir:
+        return None
+    with _CACHES_LOCK:
+        cache = _CACHES.get(cache_dir)
+        if cache is None:
+            cache = _CACHES[cache_dir] = ImageCache(cache_dir, max_mb << 20)
+            multiprocessing.util.Finalize(cache, cache.close, exitpriority=10)
+    return cache
+
+
+_PYRAMIDS: Dict[int, PyramidCache] = {}
+
+
+def _uses_pyramid(baseline: str, pyramid_mb: int) -> bool:
+    return pyramid_mb > 0 and hasattr(BASELINES[baseline], "predict_pyramid")
+
+
+def _get_pyramids(max_mb: int) -> PyramidCache:
+    with _CACHES_LOCK:
+        cache = _PYRAMIDS.get(max_mb)
+        if cache is None:
+            cache = _PYRAMIDS[max_mb] = PyramidCache(max_mb << 20)
+    return cache
+
+
+def _open_pyramid(path: str, size: Tuple[int, int], max_mb: int, overview: int):
+    # Builds the overview level (decoding level 0 on the way) so a broken
+    # file is reported like a failed decode; returns (pyramid, err).
+    pyr = Pyramid(path, _get_pyramids(max_mb), size=size)
+    try:
+        pyr.level(pyr.level_for(overview))
+    except FileNotFoundError:
+        return None, f"file not found: {path}"
+    except Image.UnidentifiedImageError:
+        return None, f"unsupported format: {path}"
+    except OSError as e:
+        return None, f"os error: {e}"
+    return pyr, None
+
+
+def _load_group(
+    rs: List[Dict],
+    root: str,
+    max_resolution: Optional[int],
+    baseline: str,
+    fast_decode: bool = False,
+    image_cache: Optional[str] = None,
+    image_cache_mb: int = 2048,
+    profile: bool = False,
+    trace: bool = False,
+    pyramid_mb: int = 0,
+    verify_images: bool = False,
+) -> Tuple:
+    # Decode (or header-read) one screenshot for all of its records. Safe to
+    # run on a reader thread; returns (rs, img_path, im, err, scale, profile).
+    # Pyramid baselines decode lazily at score time, at full resolution.
+    inst = Instrumentation(keep_events=trace) if profile else NULL
+    img_path = _resolve_image_path(rs[0], root)
+
+    if _uses_pyramid(baseline, pyramid_mb):
+        with inst.stage("header"):
+            im, err, scale = safe_image_size(img_path)
+    elif needs_pixels(BASELINES[baseline]):
+        cache = _get_cache(image_cache, image_cache_mb)
+        hits = cache.hits if cache else 0
+        with inst.stage("decode"):
+            im, err, scale = safe_open_image(
+                img_path, max_resolution, fast=fast_decode, cache=cache
+            )
+        if inst.enabled and not err:
+            if cache and cache.hits > hits:
+                inst.count("cache_hits")
+            else:
+                inst.count("bytes_read", os.path.getsize(img_path))
+    else:
+        with inst.stage("header"):
+            im, err, scale = safe_image_size(img_path, max_resolution, verify=verify_images)
+    return rs, img_path, im, err, scale, inst.export()
+
+
+def _loaded_bytes(loaded: Tuple) -> int:
+    im = loaded[2]
+    if isinstance(im, Image.Image):
+        return im.width * im.height * len(im.getbands())
+    return 0
+
+
+def _score_group(
+    loaded: Tuple,
+    root: str,
+    baseline: str,
+    profile: bool = False,
+    trace: bool = False,
+    pyramid_mb: int = 0,
+    max_resolution: Optional[int] = None,
+) -> Tuple[List[Tuple[Optional[Dict], Optional[Dict]]], Optional[Dict]]:
+    # Returns ([(row, skip), ...] in input order, profile); profile is None
+    # unless profiling is on.
+    rs, img_path, im, err, scale, load_prof = loaded
+    inst = Instrumentation(keep_events=trace) if profile else NULL
+    inst.merge(load_prof)
+    model = BASELINES[baseline]
+    predict = model.predict
+    if not err and _uses_pyramid(baseline, pyramid_mb):
+        # boxes come back in original pixels; max_resolution sizes the overview.
+        # The pyramid decodes here rather than in _load_group, once per group.
+        overview = max_resolution or 1280
+        with inst.stage("decode"):
+            im, err = _open_pyramid(img_path, im.size, pyramid_mb, overview)
+        predict = functools.partial(model.predict_pyramid, overview=overview)
+    if err:
+        inst.count("skipped", len(rs))
+        return [(None, {"path": img_path, "reason": err}) for _ in rs], inst.export()
+
+    priors = os.path.join(root, "baselines", "screenspot_pro", "priors.json")
+    W, H = im.size
+    out = []
+    for r in rs:
+        # Scale gold box if we resized
+        gx0, gy0, gx1, gy1 = r["bbox"]
+        gold = (
+            [int(gx0 * scale), int(gy0 * scale), int(gx1 * scale), int(gy1 * scale)]
+            if scale != 1.0
+            else r["bbox"]
+        )
+
+        with inst.stage("predict"):
+            pred = predict(im, r["instruction"], priors)
+        box, conf = pred.box, pred.confidence
+
+        with inst.stage("score"):
+            success = center_in_box(box, gold, W, H)
+        row = {
+            "image_path": img_path,
+            "instruction": r["instruction"],
+            "pred_box": box,
+            "gold_box": gold,
+            "target_type": r["target_type"],
+            "W": W,
+            "H": H,
+            "success": success,
+            "confidence": float(conf),
+            "scale": scale,
+        }
+        out.append((row, None))
+    return out, inst.export()
+
+
+def _eval_group(rs: List[Dict], load, score):
+    # Evaluates every record of one screenshot against a single decode.
+    return score(load(rs))
+
+
+def _prefetched(load, score, tasks, depth: int, threads: int, max_bytes: int) -> Iterator:
+    # reader threads decode ahead while this thread predicts and scores
+    loads = Prefetcher(load, tasks, depth, threads, max_bytes, size_of=_loaded_bytes)
+    return map(score, loads)
+
+
+def _group_by_image(records, root: str) -> List[List[int]]:
+    # record indices per resolved screenshot, in order of first appearance
+    groups: Dict[str, List[int]] = {}
+    for i, r in enumerate(records):
+        groups.setdefault(_resolve_image_path(r, root), []).append(i)
+    return list(groups.values())
+
+
+def _carry_over(path: str, compression: str, batch_size: int) -> Iterator[Dict]:
+    # Yield the rows already in ``path`` while rewriting them to a fresh file,
+    # so a torn last line (or gzip member) from a preempted run is dropped
+    # before new rows are appended.
+    tmp = path + ".resume"
+    with JsonlWriter(tmp, compression, batch_size) as w:
+        for row in iter_jsonl(path, compression):
+            w.write(row)
+            yield row
+    os.replace(tmp, path)
+
+
+def _pending(records, root: str, done: Counter) -> List[Dict]:
+    # Counter rather than set: duplicate annotations are each evaluated once.
+    out = []
+    for r in records:
+        key = (_resolve_image_path(r, root), r["instruction"])
+        if done[key] > 0:
+            done[key] -= 1
+        else:
+            out.append(r)
+    return out
+
+
+def _load_to_slab(task, load, name: str, slot_bytes: int):
+    # pool-worker side of _shm_map: decode, then park the pixels in our slot
+    rs, slot = task
+    loaded = load(rs)
+    im = loaded[2]
+    if isinstance(im, Image.Image):
+        ref = write_image(name, slot_bytes, slot, im, loaded[4])
+        if ref is not None:
+            loaded = loaded[:2] + (ref,) + loaded[3:]
+    return slot, loaded
+
+
+def _shm_map(load, score, tasks, workers: int, slots: int, slot_bytes: int) -> Iterator:
+    # Workers decode into shared-memory slots; this process copies each image
+    # out, recycles the slot and runs predict/score. At most ``slots`` decoded
+    # images exist at once.
+    slab = SlabPool(slots, slot_bytes)
+
+    def feed():
+        for rs in tasks:
+            slot = slab.acquire()
+            if slot is None:
+                return
+            yield rs, slot
+
+    work = functools.partial(_load_to_slab, load=load, name=slab.name, slot_bytes=slot_bytes)
+    pool = multiprocessing.Pool(workers)
+    try:
+        for slot, loaded in pool.imap(work, feed()):
+            if isinstance(loaded[2], SlabImage):
+                loaded = loaded[:2] + (slab.read(loaded[2]),) + loaded[3:]
+            slab.release(slot)
+            yield score(loaded)
+        # close/join (not terminate) so worker finalizers flush cache indexes
+        pool.close()
+        pool.join()
+    finally:
+        # closing the slab first unblocks a feeder waiting for a free slot
+        slab.close()
+        pool.terminate()
+
+
+def _map(work, tasks, n: int, workers: int, mapper=None) -> Iterator:
+    # mapper: an alternative execution strategy (prefetch threads, shared
+    # memory) taking the task iterator and yielding results in order
+    if mapper is not None:
+        yield from mapper(tasks)
+        return
+    if workers <= 1:
+        yield from map(work, tasks)
+        return
+    chunksize = max(1, n // (workers * 8))
+    pool = multiprocessing.Pool(workers)
+    try:
+        yield from pool.imap(work, tasks, chunksize=chunksize)
+        # close/join (not terminate) so worker finalizers flush cache indexes
+        pool.close()
+        pool.join()
+    finally:
+        pool.terminate()
+
+
+def _iter_results(records, work, workers: int, root: str, mapper=None) -> Iterator:
+    # Each screenshot is decoded once for all of its records. Results go
+    # through a reorder buffer and are yielded as (row, skip, profile) in
+    # record order regardless of grouping or worker count, so the
+    # per-example output and summary match a serial run exactly. A group's
+    # profile rides on its first record.
+    groups = _group_by_image(records, root)
+    tasks = ([records[i] for i in g] for g in groups)
+    ready: Dict[int, Tuple] = {}
+    nxt = 0
+    for idxs, (results, prof) in zip(groups, _map(work, tasks, len(groups), workers, mapper)):
+        for k, (i, (row, skip)) in enumerate(zip(idxs, results)):
+            ready[i] = (row, skip, prof if k == 0 else None)
+        while nxt in ready:
+            yield ready.pop(nxt)
+            nxt += 1
+
+
+def _run(records, work, args, inst, acc: SummaryAccumulator, writer=None, mapper=None) -> List[Dict]:
+    skipped = []
+    for row, skip, prof in _iter_results(records, work, args.workers, args.root, mapper):
+        inst.merge(prof)
+        if skip:
+            skipped.append(skip)
+            continue
+        acc.update(row)
+        if writer:
+            with inst.stage("serialize"):
+                writer.write(row)
+    return skipped
+
+
+def _run_claimed(records, work, args, inst, acc: SummaryAccumulator, mapper=None):
+    # Work stealing over a shared directory: each claimed chunk is written to
+    # its own jsonl plus a summary file that marks it complete.
+    bounds = open_plan(args.claim_dir, len(records), args.claim_chunk)
+    skipped: List[Dict] = []
+    units: List[int] = []
+    for unit in claim_units(args.claim_dir, len(bounds)):
+        start, stop = bounds[unit]
+        unit_acc = SummaryAccumulator()
+        out = unit_output(args.claim_dir, unit)
+        t0 = time.time()
+        with JsonlWriter(out + ".tmp", "none", args.flush_every) as w:
+            unit_skipped = _run(records[start:stop], work, args, inst, unit_acc, w, mapper)
+        os.replace(out + ".tmp", out)
+        summary = unit_acc.finalize()
+        summary.update(
+            unit=unit,
+            evaluated_count=unit_acc.n,
+            skipped_count=len(unit_skipped),
+            skipped_paths=unit_skipped,
+            wall_time_s=time.time() - t0,
+        )
+        path = unit_summary(args.claim_dir, unit)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        os.replace(path + ".tmp", path)
+        acc.merge(unit_acc)
+        skipped.extend(unit_skipped)
+        units.append(unit)
+    return skipped, units
+
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--annotations", required=True)
+    ap.add_argument(
+        "--annotations",
+        required=True,
+        help="annotations.jsonl or a directory built by tools/compile_annotations.py",
+    )
     ap.add_argument("--root", default=".")
     ap.add_argument("--subset", type=int, default=0)
     ap.add_argument("--max_resolution", type=int, default=None)
-    ap.add_argument("--per_example_file", default=None)
+    ap.add_argument(
+        "--per_example_file",
+        default=None,
+        help="stream one JSON line per example here (.gz/.zst compress)",
+    )
+    ap.add_argument(
+        "--output_compression",
+        choices=["auto", "none", "gzip", "zstd"],
+        default="auto",
+        help="per-example file compression (auto: from the extension)",
+    )
+    ap.add_argument(
+        "--flush_every",
+        type=int,
+        default=64,
+        help="rows buffered before each write to --per_example_file",
+    )
     ap.add_argument("--calibration_png", default=None)
-    ap.add_argument("--baseline", choices=["region", "text"], default="region")
+    ap.add_argument("--baseline", choices=sorted(BASELINES), default="region")
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes used for decode, resize and predict (1 = serial)",
+    )
+    ap.add_argument(
+        "--fast_decode",
+        action="store_true",
+        help="decode at reduced size (JPEG draft / Image.reduce) before resizing",
+    )
+    ap.add_argument(
+        "--image_cache",
+        default=None,
+        help="directory for the persistent preprocessed-image cache",
+    )
+    ap.add_argument("--image_cache_mb", type=int, default=2048)
+    ap.add_argument(
+        "--verify_images",
+        action="store_true",
+        help="size-only baselines read just the image header, so truncated or corrupt "
+        "files are scored rather than skipped as in decode runs; this also runs "
+        "Image.verify() on every screenshot (reads the file, no decode) so "
+        "skipped_paths match",
+    )
+    ap.add_argument(
+        "--profile",
+        action="store_true",
+        help="add a per-stage time/counter breakdown to the summary",
+    )
+    ap.add_argument(
+        "--trace_file",
+        default=None,
+        help="stream per-stage Chrome trace events here (implies --profile)",
+    )
+    ap.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        help="screenshots decoded ahead on reader threads when --workers is 1 (0 = off)",
+    )
+    ap.add_argument("--prefetch_threads", type=int, default=2)
+    ap.add_argument(
+        "--prefetch_mb",
+        type=int,
+        default=512,
+        help="stop reading ahead while decoded-but-unused images hold this much",
+    )
+    ap.add_argument(
+        "--shm_slots",
+        type=int,
+        default=0,
+        help="with --workers > 1: decode in the workers, predict in this process, "
+        "and pass pixels through this many shared-memory slots (0 = off)",
+    )
+    ap.add_argument(
+        "--shm_slot_mb",
+        type=int,
+        default=0,
+        help="slot size; default fits a max_resolution^2 RGB image (32 MB if unset)",
+    )
+    ap.add_argument(
+        "--pyramid_mb",
+        type=int,
+        default=0,
+        help="baselines with predict_pyramid search a lazily built multi-scale pyramid "
+        "held in an LRU of this many MB per process; --max_resolution then sets the "
+        "overview size and boxes are scored in original pixels (0 = off)",
+    )
+    ap.add_argument("--num_shards", type=int, default=1)
+    ap.add_argument(
+        "--shard_index",
+        type=int,
+        default=0,
+        help="evaluate one of --num_shards image-size-balanced shards (before --subset)",
+    )
+    ap.add_argument(
+        "--shard",
+        default=None,
+        help="i/n: evaluate only the i-th of n contiguous slices; with an index, other "
+        "rows are never read (before --subset; see --num_shards for size-balanced shards)",
+    )
+    ap.add_argument(
+        "--claim_dir",
+        default=None,
+        help="shared directory: nodes claim chunks of work from it until none are left",
+    )
+    ap.add_argument("--claim_chunk", type=int, default=256, help="records per claimed chunk")
+    ap.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip examples already in --per_example_file and append the rest",
+    )
     args = ap.parse_args()
+    if args.resume and not args.per_example_file:
+        ap.error("--resume needs --per_example_file")
+    if args.shard:
+        if args.num_shards > 1:
+            ap.error("--shard and --num_shards/--shard_index are alternatives")
+        try:
+            parse_shard(args.shard)
+        except ValueError as e:
+            ap.error(str(e))
+    if not 0 <= args.shard_index < args.num_shards:
+        ap.error(f"--shard_index {args.shard_index} out of range for --num_shards {args.num_shards}")
+    if args.claim_dir and (args.per_example_file or args.num_shards > 1 or args.shard):
+        ap.error("--claim_dir writes per-chunk files; combine them with envs.screenspot_pro.merge")
 
-    records = load_jsonl(args.annotations)
+    profile = args.profile or bool(args.trace_file)
+    inst = Instrumentation(args.trace_file) if profile else NULL
+
+    with inst.stage("load_annotations"):
+        if is_index(args.annotations):
+            records = AnnotationIndex(args.annotations)
+        else:
+            records = load_jsonl(args.annotations)
+    if args.shard:
+        start, stop = shard_bounds(len(records), *parse_shard(args.shard))
+        records = records[start:stop]
+    elif args.num_shards > 1:
+        with inst.stage("plan_shards"):
+            if isinstance(records, AnnotationIndex):
+                # only the image-path column is read, one decode per screenshot
+                paths = records.image_paths()
+            else:
+                paths = [r["image_path"] for r in records]
+            paths = [_resolve_image_path({"image_path": p}, args.root) for p in paths]
+            rows = plan_shards(paths, args.num_shards)[args.shard_index]
+            records = [records[i] for i in rows]
     if args.subset and args.subset < len(records):
         records = records[: args.subset]
 
-    per = []
-    skipped = []
-    t0 = time.time()
-    for r in records:
-        img_path = (
-            os.path.join(args.root, "data", "mock_screenspot_pro", r["image_path"])
-            if not os.path.isabs(r["image_path"])
-            else r["image_path"]
+    load = functools.partial(
+        _load_group,
+        root=args.root,
+        max_resolution=args.max_resolution,
+        baseline=args.baseline,
+        fast_decode=args.fast_decode,
+        image_cache=args.image_cache,
+        image_cache_mb=args.image_cache_mb,
+        profile=profile,
+        trace=bool(args.trace_file),
+        pyramid_mb=args.pyramid_mb,
+        verify_images=args.verify_images,
+    )
+    score = functools.partial(
+        _score_group,
+        root=args.root,
+        baseline=args.baseline,
+        profile=profile,
+        trace=bool(args.trace_file),
+        pyramid_mb=args.pyramid_mb,
+        max_resolution=args.max_resolution,
+    )
+    work = functools.partial(_eval_group, load=load, score=score)
+    mapper = None
+    if (
+        args.shm_slots > 0
+        and args.workers > 1
+        and needs_pixels(BASELINES[args.baseline])
+        and not _uses_pyramid(args.baseline, args.pyramid_mb)
+    ):
+        if args.shm_slot_mb:
+            slot_bytes = args.shm_slot_mb << 20
+        elif args.max_resolution:
+            slot_bytes = 3 * args.max_resolution * args.max_resolution
+        else:
+            slot_bytes = 32 << 20
+        mapper = functools.partial(
+            _shm_map,
+            load,
+            score,
+            workers=args.workers,
+            slots=args.shm_slots,
+            slot_bytes=slot_bytes,
         )
-
-        im, err, scale = safe_open_image(img_path, args.max_resolution)
-        if err:
-            skipped.append({"path": img_path, "reason": err})
-            continue
-
-        # Scale gold box if we resized
-        gx0, gy0, gx1, gy1 = r["bbox"]
-        gold = (
-            [int(gx0 * scale), int(gy0 * scale), int(gx1 * scale), int(gy1 * scale)]
-            if scale != 1.0
-            else r["bbox"]
+    elif args.prefetch > 0 and args.workers <= 1:
+        mapper = functools.partial(
+            _prefetched,
+            load,
+            score,
+            depth=args.prefetch,
+            threads=args.prefetch_threads,
+            max_bytes=args.prefetch_mb << 20,
         )
 
-        priors = os.path.join(args.root, "baselines", "screenspot_pro", "priors.json")
-        if args.baseline == "region":
-            box = region_search.predict_box(im, r["instruction"], priors)
-            conf = region_search.predict_confidence(im, r["instruction"], priors)
-        else:
-            box = text_rule.predict_box(im, r["instruction"], priors)
-            conf = text_rule.predict_confidence(im, r["instruction"], priors)
-
-        W, H = im.size
-        success = center_in_box(box, gold, W, H)
-        per.append(
-            {
-                "image_path": img_path,
-                "instruction": r["instruction"],
-                "pred_box": box,
-                "gold_box": gold,
-                "target_type": r["target_type"],
-                "W": W,
-                "H": H,
-                "success": success,
-                "confidence": float(conf),
-                "scale": scale,
-            }
+    acc = SummaryAccumulator()
+    resumed = 0
+    if args.resume and os.path.exists(args.per_example_file):
+        done: Counter = Counter()
+        kind = _compression_for(args.per_example_file, args.output_compression)
+        with inst.stage("resume"):
+            for row in _carry_over(args.per_example_file, kind, args.flush_every):
+                acc.update(row)
+                done[row["image_path"], row["instruction"]] += 1
+            resumed = acc.n
+            records = _pending(records, args.root, done)
+
+    writer = (
+        JsonlWriter(
+            args.per_example_file,
+            args.output_compression,
+            args.flush_every,
+            append=bool(resumed),
         )
+        if args.per_example_file
+        else None
+    )
+    t0 = time.time()
+    if args.claim_dir:
+        skipped, units = _run_claimed(records, work, args, inst, acc, mapper)
+    else:
+        units = None
+        try:
+            skipped = _run(records, work, args, inst, acc, writer, mapper)
+        finally:
+            if writer:
+                writer.close()
 
     wall = time.time() - t0
-    summary = summarize(per)
-    if per:
-        summary["avg_inference_time_ms"] = 1000.0 * wall / len(per)
+    for cache in _CACHES.values():
+        cache.close()
+    with inst.stage("summarize"):
+        summary = acc.finalize()
+    if acc.n > resumed:
+        summary["avg_inference_time_ms"] = 1000.0 * wall / (acc.n - resumed)
     summary["wall_time_s"] = wall
-    summary["evaluated_count"] = len(per)
+    summary["evaluated_count"] = acc.n
+    if args.resume:
+        summary["resumed_count"] = resumed
     summary["skipped_count"] = len(skipped)
     if skipped:
         summary["skipped_paths"] = skipped
+    if units is not None:
+        summary["claimed_units"] = units
 
+    if args.calibration_png and acc.n:
+        _save_calibration_png(acc.cnt_conf, acc.ok_conf, args.calibration_png)
+    if profile:
+        summary["profile"] = inst.summary()
+        inst.close()
     print(json.dumps(summary, indent=2))
-    if args.per_example_file:
-        with open(args.per_example_file, "w", encoding="utf-8") as f:
-            json.dump(per, f, indent=2)
-    if args.calibration_png and per:
-        _save_calibration_png(per, args.calibration_png)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,199 @@
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from PIL import Image
+
+_INDEX = "index.json"
+_LOCK = "index.lock"
+
+
+class ImageCache:
+    """On-disk cache of preprocessed (RGB, resized) images.
+
+    Each entry is a raw uint8 ``<key>.npy`` array that is memory-mapped on read,
+    so a warm run never touches the PNG/JPEG decoder, plus a small
+    ``<key>.json`` with its scale factor and size. The key covers the
+    resolved source path, its mtime and byte size, and ``max_resolution``;
+    editing a screenshot simply produces a new key. ``index.json`` records
+    the size and last use of every entry and drives LRU eviction once the
+    total exceeds ``max_bytes``.
+
+    Index bookkeeping stays in memory: new entries and touches are merged
+    into ``index.json`` under an flock every ``flush_every`` puts and on
+    ``close``, and a lookup that misses the in-memory index only checks for
+    the entry's sidecar, so a cold run costs O(1) per image rather than a
+    full index rewrite. Several processes may share one directory; each
+    evicts from its own view between merges, so the cap can be overshot by
+    what other processes added since their last merge. Within a process the
+    cache may be used from several (prefetch) threads.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 << 30, flush_every: int = 64):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.flush_every = max(1, flush_every)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index: Dict[str, Dict] = self._read_index()
+        self._nbytes = sum(m["nbytes"] for m in self._index.values())
+        self._new: Dict[str, Dict] = {}
+        self._removed: Set[str] = set()
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def _read_index(self) -> Dict[str, Dict]:
+        try:
+            with open(os.path.join(self.cache_dir, _INDEX), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.cache_dir, _LOCK), "a") as lf:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".npy")
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _read_meta(self, key: str) -> Optional[Dict]:
+        # entries another process added since our last merge
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def key(path: str, max_resolution: Optional[int], fast: bool = False) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        raw = (
+            f"{os.path.realpath(path)}\0{st.st_mtime_ns}\0{st.st_size}"
+            f"\0{max_resolution}\0{int(fast)}"
+        )
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(
+        self, path: str, max_resolution: Optional[int], fast: bool = False
+    ) -> Optional[Tuple[np.ndarray, float]]:
+        key = self.key(path, max_resolution, fast)
+        with self._lock:
+            meta = self._index.get(key) if key else None
+            if meta is None and key:
+                meta = self._read_meta(key)
+                if meta is not None:
+                    self._index[key] = meta
+                    self._nbytes += meta["nbytes"]
+            if meta is None:
+                self.misses += 1
+                return None
+            try:
+                arr = np.load(self._entry_path(key), mmap_mode="r")
+            except (OSError, ValueError):
+                self._nbytes -= self._index.pop(key)["nbytes"]
+                self.misses += 1
+                return None
+            meta["last_used"] = self._touched[key] = time.time()
+            self.hits += 1
+        return arr, float(meta["scale"])
+
+    def put(
+        self,
+        path: str,
+        max_resolution: Optional[int],
+        im: Image.Image,
+        scale: float,
+        fast: bool = False,
+    ) -> None:
+        key = self.key(path, max_resolution, fast)
+        if key is None:
+            return
+        arr = np.asarray(im if im.mode == "RGB" else im.convert("RGB"), dtype=np.uint8)
+        if arr.nbytes > self.max_bytes:
+            return
+        meta = {"scale": scale, "nbytes": int(arr.nbytes)}
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(self._meta_path(key) + suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(self._meta_path(key) + suffix, self._meta_path(key))
+        with open(self._entry_path(key) + suffix, "wb") as f:
+            np.save(f, arr)
+        os.replace(self._entry_path(key) + suffix, self._entry_path(key))
+        with self._lock:
+            old = self._index.get(key)
+            if old is not None:
+                self._nbytes -= old["nbytes"]
+            meta["last_used"] = self._touched[key] = time.time()
+            self._index[key] = self._new[key] = meta
+            self._removed.discard(key)
+            self._nbytes += meta["nbytes"]
+            if self._nbytes > self.max_bytes:
+                self._removed.update(self._evict(self._index, keep={key}))
+                self._nbytes = sum(m["nbytes"] for m in self._index.values())
+            if len(self._new) >= self.flush_every:
+                self.flush()
+
+    def flush(self) -> None:
+        """Merge this process's new entries, evictions and touches into index.json."""
+        with self._lock:
+            if not (self._new or self._removed or self._touched):
+                return
+            with self._locked():
+                index = self._read_index()
+                index.update(self._new)
+                for key in self._removed:
+                    index.pop(key, None)
+                for key, t in self._touched.items():
+                    if key in index:
+                        index[key]["last_used"] = max(t, index[key].get("last_used", 0.0))
+                self._evict(index, keep=set(self._new))
+                tmp = os.path.join(self.cache_dir, _INDEX + f".{os.getpid()}.tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(index, f)
+                os.replace(tmp, os.path.join(self.cache_dir, _INDEX))
+            self._index = index
+            self._nbytes = sum(m["nbytes"] for m in index.values())
+            self._new, self._removed, self._touched = {}, set(), {}
+
+    def _evict(self, index: Dict[str, Dict], keep) -> List[str]:
+        total = sum(m["nbytes"] for m in index.values())
+        removed: List[str] = []
+        if total <= self.max_bytes:
+            return removed
+        for key in sorted(index, key=lambda k: index[k].get("last_used", 0.0)):
+            if total <= self.max_bytes:
+                break
+            if key in keep:
+                continue
+            total -= index.pop(key)["nbytes"]
+            removed.append(key)
+            for path in (self._entry_path(key), self._meta_path(key)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def close(self) -> None:
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
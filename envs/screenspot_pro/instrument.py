@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class NullInstrumentation:
+    """Disabled instrumentation: every hook is a no-op returning shared objects."""
+
+    __slots__ = ()
+    enabled = False
+
+    def stage(self, name: str):
+        return _NULL_TIMER
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+    def export(self) -> None:
+        return None
+
+    def merge(self, exported) -> None:
+        pass
+
+    def summary(self) -> Dict:
+        return {}
+
+    def close(self) -> None:
+        pass
+
+
+NULL = NullInstrumentation()
+
+
+class _StageTimer:
+    __slots__ = ("inst", "name", "t0")
+
+    def __init__(self, inst: "Instrumentation", name: str):
+        self.inst = inst
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter_ns()
+        self.inst._record(self.name, self.t0, t1)
+        return False
+
+
+class Instrumentation:
+    """Per-stage timers and counters for the eval hot path.
+
+    ``stage(name)`` is a context manager that accumulates wall time per stage;
+    ``count(name, n)`` bumps a counter (skipped items, cache hits, bytes read).
+    Worker processes ``export()`` a small dict that the parent ``merge()``s.
+    With ``trace_path`` every stage is also streamed as a Chrome trace "X"
+    event, one per line, loadable in chrome://tracing or Perfetto.
+    """
+
+    enabled = True
+
+    def __init__(self, trace_path: Optional[str] = None, keep_events: bool = False):
+        self.totals_ns: Dict[str, int] = {}
+        self.calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self._keep_events = keep_events
+        self._events: List[Dict] = []
+        self._trace = None
+        self._sep = ""
+        self._lock = threading.Lock()
+        if trace_path:
+            self._trace = open(trace_path, "w", encoding="utf-8")
+            self._trace.write("[")
+
+    def stage(self, name: str) -> _StageTimer:
+        return _StageTimer(self, name)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def _record(self, name: str, t0: int, t1: int) -> None:
+        self.totals_ns[name] = self.totals_ns.get(name, 0) + (t1 - t0)
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self._trace is not None or self._keep_events:
+            ev = {
+                "name": name,
+                "ph": "X",
+                "ts": t0 / 1000.0,
+                "dur": (t1 - t0) / 1000.0,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            }
+            if self._keep_events:
+                self._events.append(ev)
+            if self._trace is not None:
+                self._write_event(ev)
+
+    def _write_event(self, ev: Dict) -> None:
+        with self._lock:
+            self._trace.write(self._sep + "\n" + json.dumps(ev))
+            self._sep = ","
+
+    def export(self) -> Dict:
+        return {
+            "totals_ns": self.totals_ns,
+            "calls": self.calls,
+            "counters": self.counters,
+            "events": self._events,
+        }
+
+    def merge(self, exported: Optional[Dict]) -> None:
+        if not exported:
+            return
+        for name, ns in exported["totals_ns"].items():
+            self.totals_ns[name] = self.totals_ns.get(name, 0) + ns
+        for name, n in exported["calls"].items():
+            self.calls[name] = self.calls.get(name, 0) + n
+        for name, n in exported["counters"].items():
+            self.count(name, n)
+        if self._keep_events:
+            self._events.extend(exported.get("events", ()))
+        if self._trace is not None:
+            for ev in exported.get("events", ()):
+                self._write_event(ev)
+
+    def summary(self) -> Dict:
+        stages = {
+            name: {
+                "count": self.calls[name],
+                "total_s": ns / 1e9,
+                "mean_ms": ns / 1e6 / self.calls[name],
+            }
+            for name, ns in sorted(self.totals_ns.items(), key=lambda kv: -kv[1])
+        }
+        return {"stages": stages, "counters": dict(self.counters)}
+
+    def close(self) -> None:
+        if self._trace is not None:
+            # the Chrome trace array format tolerates a missing "]", so a
+            # crashed run still leaves a loadable file
+            self._trace.write("\n]\n")
+            self._trace.close()
+            self._trace = None
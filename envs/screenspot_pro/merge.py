@@ -0,0 +1,79 @@
+"""Combine sharded or work-stealing eval outputs into one report.
+
+    python -m envs.screenspot_pro.merge shard0.jsonl shard1.jsonl \
+        --summaries shard0.json shard1.json --out all.jsonl
+    python -m envs.screenspot_pro.merge /shared/run1 --out all.jsonl
+
+Inputs are --per_example_file outputs or --claim_dir directories. Metrics
+are recomputed from the rows, so they match a single-process run exactly;
+the summaries only contribute skipped examples and compute time.
+"""
+import argparse
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .metrics import SummaryAccumulator
+from .sharding import finished_units, unit_output, unit_summary
+from .writer import JsonlWriter, iter_jsonl
+
+
+def _expand(inputs: Sequence[str], summaries: Sequence[str]) -> Tuple[List[str], List[str], List[int]]:
+    files, sums, missing = [], list(summaries), []
+    for path in inputs:
+        if os.path.isdir(path):
+            done, todo = finished_units(path)
+            files.extend(unit_output(path, u) for u in done)
+            sums.extend(unit_summary(path, u) for u in done)
+            missing.extend(todo)
+        else:
+            files.append(path)
+    return files, sums, missing
+
+
+def merge(inputs: Sequence[str], summaries: Sequence[str] = (), out: Optional[str] = None) -> Dict:
+    files, sums, missing = _expand(inputs, summaries)
+    acc = SummaryAccumulator()
+    writer = JsonlWriter(out) if out else None
+    try:
+        for path in files:
+            for row in iter_jsonl(path):
+                acc.update(row)
+                if writer:
+                    writer.write(row)
+    finally:
+        if writer:
+            writer.close()
+
+    skipped: List[Dict] = []
+    compute = 0.0
+    for path in sums:
+        with open(path, "r", encoding="utf-8") as f:
+            s = json.load(f)
+        skipped.extend(s.get("skipped_paths", []))
+        compute += s.get("wall_time_s", 0.0)
+
+    report = acc.finalize()
+    report["evaluated_count"] = acc.n
+    report["skipped_count"] = len(skipped)
+    if skipped:
+        report["skipped_paths"] = skipped
+    report["merged_files"] = len(files)
+    if sums:
+        report["compute_time_s"] = compute
+    if missing:
+        report["missing_units"] = missing
+    return report
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("inputs", nargs="+", help="per-example files and/or --claim_dir directories")
+    ap.add_argument("--summaries", nargs="*", default=[], help="summary JSON printed by each shard")
+    ap.add_argument("--out", default=None, help="write the combined per-example JSONL here")
+    args = ap.parse_args(argv)
+    print(json.dumps(merge(args.inputs, args.summaries, args.out), indent=2))
+
+
+if __name__ == "__main__":
+    main()
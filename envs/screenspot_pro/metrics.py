@@ -1,4 +1,7 @@
-from typing import List
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
 
 
 def _center(b):
@@ -24,40 +27,254 @@ def _area(b):
     return max(0, x1 - x0) * max(0, y1 - y0)
 
 
-def _bucket(b):
+_BUCKET_EDGES = (10000, 250000)
+_BUCKETS = ("small", "medium", "large")
+_TYPES = ("text", "icon")
+_TYPE_INDEX = {t: i for i, t in enumerate(_TYPES)}
+
+
+def _bucket_index(b) -> int:
     a = _area(b)
-    if a < 10000:
-        return "small"
-    if a < 250000:
-        return "medium"
-    return "large"
+    if a < _BUCKET_EDGES[0]:
+        return 0
+    if a < _BUCKET_EDGES[1]:
+        return 1
+    return 2
+
+
+def _bucket(b):
+    return _BUCKETS[_bucket_index(b)]
+
+
+def bucket_names(edges: Sequence[int]) -> List[str]:
+    # the default edges keep their small/medium/large names
+    if tuple(edges) == _BUCKET_EDGES:
+        return list(_BUCKETS)
+    bounds = [0, *edges]
+    names = [f"area_{lo}_{hi}" for lo, hi in zip(bounds, edges)]
+    return names + [f"area_{edges[-1]}_inf"]
+
+
+class SummaryAccumulator:
+    """Builds the summarize() dict one result row at a time in O(1) memory.
+
+    Partial states from workers, shards or separate runs combine with
+    ``merge``; ``export``/``from_export`` round-trip a state through JSON.
+    Gold boxes are bucketed by area at ``bucket_edges``. Calibration is
+    counted in ``calibration_bins`` equal-width confidence bins
+    (``cnt_conf``/``ok_conf``; ``conf_micros`` sums each bin's confidence in
+    integer millionths, so merged states match a single pass exactly).
+    ``update_batch`` adds a chunk of columns in one NumPy pass.
+    """
+
+    __slots__ = (
+        "n",
+        "ok",
+        "cnt_type",
+        "ok_type",
+        "cnt_bucket",
+        "ok_bucket",
+        "cnt_conf",
+        "ok_conf",
+        "conf_micros",
+        "bucket_edges",
+    )
+
+    def __init__(self, calibration_bins: int = 10, bucket_edges: Sequence[int] = _BUCKET_EDGES):
+        self.n = 0
+        self.ok = 0
+        self.bucket_edges = [int(e) for e in bucket_edges]
+        self.cnt_type = [0] * len(_TYPES)
+        self.ok_type = [0] * len(_TYPES)
+        self.cnt_bucket = [0] * (len(self.bucket_edges) + 1)
+        self.ok_bucket = [0] * (len(self.bucket_edges) + 1)
+        self.cnt_conf = [0] * calibration_bins
+        self.ok_conf = [0] * calibration_bins
+        self.conf_micros = [0] * calibration_bins
+
+    def update(self, r) -> None:
+        ok = 1 if r["success"] else 0
+        self.n += 1
+        self.ok += ok
+        t = _TYPE_INDEX[r["target_type"]]
+        self.cnt_type[t] += 1
+        self.ok_type[t] += ok
+        b = bisect_right(self.bucket_edges, _area(r["gold_box"]))
+        self.cnt_bucket[b] += 1
+        self.ok_bucket[b] += ok
+        conf = float(r.get("confidence", 0.0))
+        k = int(max(0.0, min(0.999, conf)) * len(self.cnt_conf))
+        self.cnt_conf[k] += 1
+        self.ok_conf[k] += ok
+        self.conf_micros[k] += round(conf * 1e6)
+
+    def update_batch(self, success, target_type, gold, confidence) -> None:
+        """``update`` over columns: success (N,), target_type (N,), gold (N, 4), confidence (N,)."""
+        ok = np.asarray(success, dtype=bool)
+        types = _type_codes(target_type)
+        buckets = bucket_batch(gold, self.bucket_edges)
+        conf = np.asarray(confidence, dtype=np.float64)
+        bins = len(self.cnt_conf)
+        k = (np.clip(conf, 0.0, 0.999) * bins).astype(np.int64)
+        self.n += len(ok)
+        self.ok += int(ok.sum())
+        for name, idx, minlength in (
+            ("type", types, len(_TYPES)),
+            ("bucket", buckets, len(self.cnt_bucket)),
+            ("conf", k, bins),
+        ):
+            cnt, hit = getattr(self, "cnt_" + name), getattr(self, "ok_" + name)
+            for i, v in enumerate(np.bincount(idx, minlength=minlength).tolist()):
+                cnt[i] += v
+            for i, v in enumerate(np.bincount(idx[ok], minlength=minlength).tolist()):
+                hit[i] += v
+        micros = np.rint(conf * 1e6)
+        for i, v in enumerate(np.bincount(k, weights=micros, minlength=bins).tolist()):
+            self.conf_micros[i] += int(v)
+
+    def merge(self, other: "SummaryAccumulator") -> "SummaryAccumulator":
+        if len(other.cnt_conf) != len(self.cnt_conf):
+            raise ValueError("cannot merge accumulators with different calibration bins")
+        if other.bucket_edges != self.bucket_edges:
+            raise ValueError("cannot merge accumulators with different bucket edges")
+        self.n += other.n
+        self.ok += other.ok
+        for name in (
+            "cnt_type",
+            "ok_type",
+            "cnt_bucket",
+            "ok_bucket",
+            "cnt_conf",
+            "ok_conf",
+            "conf_micros",
+        ):
+            mine = getattr(self, name)
+            for i, v in enumerate(getattr(other, name)):
+                mine[i] += v
+        return self
+
+    def export(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_export(cls, state: Dict) -> "SummaryAccumulator":
+        acc = cls(len(state["cnt_conf"]), state.get("bucket_edges", _BUCKET_EDGES))
+        for name in cls.__slots__:
+            # states exported before conf_micros/bucket_edges existed keep the defaults
+            if name in state:
+                value = state[name]
+                setattr(acc, name, list(value) if isinstance(value, list) else value)
+        return acc
+
+    def finalize(self) -> Dict:
+        if self.n == 0:
+            return {"success_rate": 0.0}
+
+        def rate(a, b):
+            return (a / b) if b else None
+
+        out = {"success_rate": self.ok / self.n}
+        for i, name in enumerate(_TYPES):
+            out[f"{name}_success_rate"] = rate(self.ok_type[i], self.cnt_type[i])
+        for i, name in enumerate(bucket_names(self.bucket_edges)):
+            out[f"{name}_success_rate"] = rate(self.ok_bucket[i], self.cnt_bucket[i])
+        return out
+
+    def calibration(self) -> Dict:
+        """Per-bin accuracy and mean confidence, plus expected calibration error."""
+        bins = []
+        ece = 0.0
+        for i, c in enumerate(self.cnt_conf):
+            if not c:
+                continue
+            acc = self.ok_conf[i] / c
+            conf = self.conf_micros[i] / c / 1e6
+            ece += c / self.n * abs(acc - conf)
+            bins.append({"bin": i, "count": c, "accuracy": acc, "confidence": conf})
+        return {"bins": bins, "ece": ece}
 
 
 def summarize(results):
-    n = len(results)
+    acc = SummaryAccumulator()
+    for r in results:
+        acc.update(r)
+    return acc.finalize()
+
+
+# Batch variants: (N, 4) box arrays in, one NumPy pass, results identical to
+# the scalar functions above (and to metrics.iou_score in the root package).
+
+
+def _boxes(a) -> np.ndarray:
+    a = np.asarray(a)
+    if a.dtype.kind != "f":
+        a = a.astype(np.int64, copy=False)
+    return a.reshape(-1, 4)
+
+
+def iou_batch(pred, gold) -> np.ndarray:
+    p, g = _boxes(pred), _boxes(gold)
+    iw = np.maximum(0, np.minimum(p[:, 2], g[:, 2]) - np.maximum(p[:, 0], g[:, 0]))
+    ih = np.maximum(0, np.minimum(p[:, 3], g[:, 3]) - np.maximum(p[:, 1], g[:, 1]))
+    inter = iw * ih
+    denom = _area_batch(p) + _area_batch(g) - inter
+    out = np.zeros(len(p), dtype=np.float64)
+    np.divide(inter, denom, out=out, where=denom > 0)
+    return out
+
+
+def center_in_box_batch(pred, gold, W, H) -> np.ndarray:
+    p, g = _boxes(pred), _boxes(gold)
+    W, H = np.asarray(W), np.asarray(H)
+    gx0, gy0, gx1, gy1 = g[:, 0], g[:, 1], g[:, 2], g[:, 3]
+    in_bounds = (
+        (0 <= gx0) & (gx0 < gx1) & (gx1 <= W) & (0 <= gy0) & (gy0 < gy1) & (gy1 <= H)
+    )
+    cx = (p[:, 0] + p[:, 2]) / 2.0
+    cy = (p[:, 1] + p[:, 3]) / 2.0
+    return in_bounds & (gx0 <= cx) & (cx <= gx1) & (gy0 <= cy) & (cy <= gy1)
+
+
+def _area_batch(b: np.ndarray) -> np.ndarray:
+    return np.maximum(0, b[:, 2] - b[:, 0]) * np.maximum(0, b[:, 3] - b[:, 1])
+
+
+def bucket_batch(gold, edges: Sequence[int] = _BUCKET_EDGES) -> np.ndarray:
+    # index into _BUCKETS, same thresholds as _bucket
+    return np.searchsorted(np.asarray(edges), _area_batch(_boxes(gold)), side="right")
+
+
+def _type_codes(target_type) -> np.ndarray:
+    t = np.asarray(target_type)
+    if t.dtype.kind in "iu":
+        return t
+    codes = np.full(t.shape, -1, dtype=np.int64)
+    for i, name in enumerate(_TYPES):
+        codes[t == name] = i
+    if (codes < 0).any():
+        raise KeyError(str(t[codes < 0][0]))
+    return codes
+
+
+def summarize_batch(success, target_type, gold) -> Dict[str, Optional[float]]:
+    """summarize() over columns: success (N,), target_type (N,), gold (N, 4)."""
+    ok = np.asarray(success, dtype=bool)
+    n = len(ok)
     if n == 0:
         return {"success_rate": 0.0}
-    s = sum(1 for r in results if r["success"])
-    by_type = {"text": 0, "icon": 0}
-    cnt_type = {"text": 0, "icon": 0}
-    by_bucket = {"small": 0, "medium": 0, "large": 0}
-    cnt_bucket = {"small": 0, "medium": 0, "large": 0}
-    for r in results:
-        tt = r["target_type"]
-        cnt_type[tt] += 1
-        by_type[tt] += 1 if r["success"] else 0
-        b = _bucket(r["gold_box"])
-        cnt_bucket[b] += 1
-        by_bucket[b] += 1 if r["success"] else 0
+    types = _type_codes(target_type)
+    buckets = bucket_batch(gold)
+    cnt_type = np.bincount(types, minlength=len(_TYPES))
+    by_type = np.bincount(types, weights=ok, minlength=len(_TYPES))
+    cnt_bucket = np.bincount(buckets, minlength=len(_BUCKETS))
+    by_bucket = np.bincount(buckets, weights=ok, minlength=len(_BUCKETS))
 
     def rate(a, b):
-        return (a / b) if b else None
-
-    return {
-        "success_rate": s / n,
-        "text_success_rate": rate(by_type["text"], cnt_type["text"]),
-        "icon_success_rate": rate(by_type["icon"], cnt_type["icon"]),
-        "small_success_rate": rate(by_bucket["small"], cnt_bucket["small"]),
-        "medium_success_rate": rate(by_bucket["medium"], cnt_bucket["medium"]),
-        "large_success_rate": rate(by_bucket["large"], cnt_bucket["large"]),
-    }
+        return (int(a) / int(b)) if b else None
+
+    out = {"success_rate": int(ok.sum()) / n}
+    for i, name in enumerate(_TYPES):
+        out[f"{name}_success_rate"] = rate(by_type[i], cnt_type[i])
+    for i, name in enumerate(_BUCKETS):
+        out[f"{name}_success_rate"] = rate(by_bucket[i], cnt_bucket[i])
+    return out
@@ -0,0 +1,76 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class Prefetcher:
+    """Runs ``fn`` over ``items`` on reader threads, yielding results in order.
+
+    At most ``depth`` items are in flight, and no new item is started while
+    unconsumed results would hold ``max_bytes`` or more: finished results
+    count at ``size_of``, unfinished ones at the largest size seen so far
+    (until the first result arrives, only ``threads`` items are started).
+    The head item is always allowed, so a single oversized image still makes
+    progress. Exceptions raised by ``fn`` surface in the consumer at that
+    item's position.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[T], R],
+        items: Iterable[T],
+        depth: int = 4,
+        threads: int = 2,
+        max_bytes: int = 512 << 20,
+        size_of: Callable[[R], int] = lambda r: 0,
+    ):
+        self.fn = fn
+        self.items = items
+        self.depth = max(1, depth)
+        self.threads = max(1, threads)
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+
+    def _reserved_bytes(self, pending, estimate: int) -> int:
+        total = 0
+        for f in pending:
+            if f.done() and not f.exception():
+                total += self.size_of(f.result())
+            else:
+                total += estimate
+        return total
+
+    def _may_start(self, pending, estimate: Optional[int]) -> bool:
+        if not pending:
+            return True
+        if len(pending) >= self.depth:
+            return False
+        if estimate is None:
+            return len(pending) < self.threads
+        return self._reserved_bytes(pending, estimate) < self.max_bytes
+
+    def __iter__(self) -> Iterator[R]:
+        it = iter(self.items)
+        pending: deque = deque()
+        exhausted = False
+        estimate = None
+        pool = ThreadPoolExecutor(self.threads, thread_name_prefix="prefetch")
+        try:
+            while True:
+                while not exhausted and self._may_start(pending, estimate):
+                    try:
+                        item = next(it)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.append(pool.submit(self.fn, item))
+                if not pending:
+                    return
+                result = pending.popleft().result()
+                estimate = max(estimate or 0, self.size_of(result))
+                yield result
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,185 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from .image_cache import ImageCache
+
+
+def _nbytes(im: Image.Image) -> int:
+    return im.width * im.height * len(im.getbands())
+
+
+class PyramidCache:
+    """In-memory LRU of pyramid levels shared by every Pyramid in a process.
+
+    Entries are keyed by (image key, level) and evicted least recently used
+    first once their decoded size exceeds ``max_bytes``; an entry larger
+    than the whole budget is handed back but not kept. Safe to use from
+    several (prefetch) threads.
+    """
+
+    def __init__(self, max_bytes: int = 256 << 20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._levels: "OrderedDict[Tuple[Hashable, int], Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, level: int) -> Optional[Image.Image]:
+        with self._lock:
+            im = self._levels.get((key, level))
+            if im is None:
+                self.misses += 1
+                return None
+            self._levels.move_to_end((key, level))
+            self.hits += 1
+            return im
+
+    def put(self, key: Hashable, level: int, im: Image.Image) -> None:
+        size = _nbytes(im)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._levels.pop((key, level), None)
+            if old is not None:
+                self.nbytes -= _nbytes(old)
+            self._levels[(key, level)] = im
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._levels.popitem(last=False)
+                self.nbytes -= _nbytes(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "bytes": self.nbytes}
+
+
+class Tile(NamedTuple):
+    """Crop of one pyramid level; ``origin`` is its top-left in that level's pixels."""
+
+    image: Image.Image
+    level: int
+    origin: Tuple[int, int]
+
+
+class Pyramid:
+    """Lazily built 2x image pyramid of one screenshot.
+
+    Level 0 is the full-resolution RGB decode and level k+1 is
+    ``level(k).reduce(2)``: an exact 2x2 box average whose size rounds up,
+    so level-k pixel (x, y) is the average of original pixels
+    [x*2^k, (x+1)*2^k) x [y*2^k, (y+1)*2^k) clipped to the image. Boxes use
+    the annotation convention (inclusive pixel corners) and map between
+    levels with integer arithmetic only; a box found in a level-0 tile maps
+    back to the original exactly. Levels are built on first use from the
+    next finer one and kept in ``cache``, so a baseline can look at a small
+    overview and only touch full resolution around its candidates. Level 0
+    is also held by the Pyramid itself, outside the cache budget, so its
+    tiles never decode the file twice even when the budget is smaller than
+    one full-resolution image; drop the Pyramid once done with the screenshot.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        cache: Optional[PyramidCache] = None,
+        size: Optional[Tuple[int, int]] = None,
+        min_side: int = 64,
+    ):
+        self.path = path
+        self._base: Optional[Image.Image] = None
+        self.cache = cache if cache is not None else PyramidCache()
+        self.key = ImageCache.key(path, None) or path
+        if size is None:
+            with Image.open(path) as im:
+                size = im.size
+        self.size: Tuple[int, int] = (int(size[0]), int(size[1]))
+        self.width, self.height = self.size
+        depth, side = 0, max(self.size)
+        while side > min_side:
+            side = -(-side // 2)
+            depth += 1
+        self.depth = depth + 1
+
+    def level_size(self, level: int) -> Tuple[int, int]:
+        f = 1 << level
+        return -(-self.width // f), -(-self.height // f)
+
+    def level_for(self, max_side: Optional[int]) -> int:
+        # finest level whose longer side is at most max_side
+        for level in range(self.depth):
+            if not max_side or max(self.level_size(level)) <= max_side:
+                return level
+        return self.depth - 1
+
+    def level(self, level: int) -> Image.Image:
+        level = max(0, min(level, self.depth - 1))
+        im = self.cache.get(self.key, level)
+        if im is not None:
+            return im
+        if level == 0:
+            if self._base is None:
+                with Image.open(self.path) as src:
+                    base = src.convert("RGB")
+                if base.size != self.size:
+                    raise OSError(f"{self.path} changed size while in use")
+                self._base = base
+            im = self._base
+        else:
+            im = self.level(level - 1).reduce(2)
+        self.cache.put(self.key, level, im)
+        return im
+
+    def to_original(
+        self, box: Sequence[int], level: int = 0, origin: Tuple[int, int] = (0, 0)
+    ) -> List[int]:
+        """Map an inclusive box in level (or tile) pixels to the original pixels it covers."""
+        f = 1 << level
+        x0, y0 = (box[0] + origin[0]) * f, (box[1] + origin[1]) * f
+        x1 = min(self.width - 1, (box[2] + origin[0]) * f + f - 1)
+        y1 = min(self.height - 1, (box[3] + origin[1]) * f + f - 1)
+        return [x0, y0, x1, y1]
+
+    def from_original(self, box: Sequence[int], level: int) -> List[int]:
+        """Level-``level`` pixels containing an inclusive original box (inverse of to_original)."""
+        return [v >> level for v in box]
+
+    def tile(self, box: Sequence[int], level: int = 0, pad: int = 0) -> Tile:
+        """Crop of ``level`` covering the inclusive original ``box`` plus ``pad`` level pixels."""
+        w, h = self.level_size(level)
+        x0, y0, x1, y1 = self.from_original(box, level)
+        x0, y0 = max(0, x0 - pad), max(0, y0 - pad)
+        x1, y1 = min(w - 1, x1 + pad), min(h - 1, y1 + pad)
+        crop = self.level(level).crop((x0, y0, x1 + 1, y1 + 1))
+        return Tile(crop, level, (x0, y0))
+
+    def search(
+        self,
+        propose: Callable[[Image.Image], List[Tuple[List[int], float]]],
+        refine: Callable[[Image.Image], Optional[Tuple[List[int], float]]],
+        overview: Optional[int] = 1280,
+        pad: int = 8,
+        max_candidates: int = 4,
+    ) -> List[Tuple[List[int], float]]:
+        """Coarse-to-fine search; returns (original box, score) pairs, best first.
+
+        ``propose`` sees the level whose longer side fits ``overview`` and
+        returns candidate boxes in its pixels; the best ``max_candidates``
+        are re-examined by ``refine`` on level-0 tiles padded by ``pad``
+        overview pixels. A candidate ``refine`` rejects (None) is dropped.
+        When the overview already is level 0 the proposals are final.
+        """
+        level = self.level_for(overview)
+        candidates = sorted(propose(self.level(level)), key=lambda c: -c[1])[:max_candidates]
+        if level == 0:
+            return [(self.to_original(box), score) for box, score in candidates]
+        found = []
+        for box, _ in candidates:
+            tile = self.tile(self.to_original(box, level), 0, pad << level)
+            hit = refine(tile.image)
+            if hit is not None:
+                found.append((self.to_original(hit[0], 0, tile.origin), hit[1]))
+        found.sort(key=lambda c: -c[1])
+        return found
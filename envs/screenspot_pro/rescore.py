@@ -0,0 +1,133 @@
+"""Recompute metrics from saved --per_example_file dumps without touching images.
+
+    python -m envs.screenspot_pro.rescore run_a.json run_b.json \
+        --bucket_edges 2500,10000,250000 --success iou --iou_threshold 0.5
+"""
+import argparse
+import json
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from .metrics import _BUCKET_EDGES, SummaryAccumulator, center_in_box_batch, iou_batch
+from .writer import _WS, iter_json_values, iter_jsonl, open_text
+
+_CHUNK_ROWS = 1 << 16
+
+
+def _starts_array(path: str) -> bool:
+    try:
+        with open_text(path) as f:
+            while True:
+                c = f.read(1)
+                if c not in _WS or not c:
+                    return c == "["
+    except EOFError:
+        return False
+
+
+def iter_per_example(path: str) -> Iterator[Dict]:
+    """Yield rows from a JSON-array or JSONL per-example file, one at a time.
+
+    JSONL (the eval's streaming output, possibly gzip/zstd) goes through
+    iter_jsonl, which tolerates the torn last line a preempted run leaves
+    behind, like merge does; only a JSON array needs the strict parser.
+    """
+    if not _starts_array(path):
+        yield from iter_jsonl(path)
+        return
+    with open_text(path) as f:
+        yield from iter_json_values(f)
+
+
+class _Rescore:
+    # a SummaryAccumulator plus the IoU total it does not track
+    __slots__ = ("acc", "iou_sum")
+
+    def __init__(self, args):
+        self.acc = SummaryAccumulator(args.calibration_bins, args.bucket_edges)
+        self.iou_sum = 0.0
+
+    def add(self, other: "_Rescore") -> None:
+        self.acc.merge(other.acc)
+        self.iou_sum += other.iou_sum
+
+
+def _score_chunk(rows: List[Dict], tally: _Rescore, args) -> None:
+    pred = np.array([r["pred_box"] for r in rows], dtype=np.int64).reshape(-1, 4)
+    gold = np.array([r["gold_box"] for r in rows], dtype=np.int64).reshape(-1, 4)
+    W = np.array([r["W"] for r in rows])
+    H = np.array([r["H"] for r in rows])
+    conf = np.array([float(r.get("confidence", 0.0)) for r in rows])
+
+    iou = iou_batch(pred, gold)
+    if args.success == "iou":
+        ok = iou >= args.iou_threshold
+    else:
+        ok = center_in_box_batch(pred, gold, W, H)
+    tally.acc.update_batch(ok, [r["target_type"] for r in rows], gold, conf)
+    tally.iou_sum += float(iou.sum())
+
+
+def _finalize(t: _Rescore) -> Dict:
+    if t.acc.n == 0:
+        return {"success_rate": 0.0, "evaluated_count": 0}
+    out = t.acc.finalize()
+    out["mean_iou"] = t.iou_sum / t.acc.n
+    out["calibration"] = t.acc.calibration()
+    out["evaluated_count"] = t.acc.n
+    return out
+
+
+def rescore_file(path: str, args) -> _Rescore:
+    tally = _Rescore(args)
+    chunk: List[Dict] = []
+    for row in iter_per_example(path):
+        chunk.append(row)
+        if len(chunk) >= _CHUNK_ROWS:
+            _score_chunk(chunk, tally, args)
+            chunk = []
+    if chunk:
+        _score_chunk(chunk, tally, args)
+    return tally
+
+
+def _edges(s: str) -> List[int]:
+    edges = [int(x) for x in s.split(",") if x]
+    if not edges or edges != sorted(set(edges)):
+        raise argparse.ArgumentTypeError("bucket edges must be increasing integers")
+    return edges
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("per_example_files", nargs="+")
+    ap.add_argument(
+        "--bucket_edges",
+        type=_edges,
+        default=list(_BUCKET_EDGES),
+        help="comma-separated gold-box area edges (default 10000,250000)",
+    )
+    ap.add_argument("--success", choices=["center", "iou"], default="center")
+    ap.add_argument("--iou_threshold", type=float, default=0.5)
+    ap.add_argument("--calibration_bins", type=int, default=10)
+    ap.add_argument("--out", default=None, help="also write the report JSON here")
+    args = ap.parse_args(argv)
+
+    total = _Rescore(args)
+    report = {"files": {}}
+    for path in args.per_example_files:
+        tally = rescore_file(path, args)
+        report["files"][path] = _finalize(tally)
+        total.add(tally)
+    if len(args.per_example_files) > 1:
+        report["combined"] = _finalize(total)
+
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
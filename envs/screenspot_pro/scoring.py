@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+Request = Tuple[str, Dict[str, Any]]
+
+
+class _Inflight:
+    __slots__ = ("done", "box", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.box: Optional[List[int]] = None
+        self.error: Optional[BaseException] = None
+
+
+class FallbackMemo:
+    """Bounded, thread-safe LRU of fallback boxes.
+
+    Concurrent misses on the same key wait for the first computation instead
+    of decoding the image again, so each image costs one fallback prediction
+    per process. If that computation raises, the waiters get the same
+    exception and nothing is stored, so a later call retries.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, List[int]]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Inflight] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], List[int]]) -> List[int]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return list(self._data[key])
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._inflight[key] = _Inflight()
+                self.misses += 1
+        if not owner:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            with self._lock:
+                self.hits += 1
+            return list(flight.box)
+        try:
+            box = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            flight.box = list(box)
+            with self._lock:
+                self._data[key] = list(box)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+            return box
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+class BatchedScorer:
+    """Coalesces concurrent reward calls into small batches scored on a thread pool.
+
+    Callers await ``score()``; requests arriving within ``max_wait_s`` of the
+    first pending one (or until ``max_batch`` are pending) are handed to one
+    worker thread together, so the image I/O of baseline fallbacks overlaps
+    with generation on the event loop. With ``key``, requests in a batch that
+    share a key are scored once. An exception from ``score_batch`` is raised
+    in every caller of that batch.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[Request]], List[float]],
+        max_batch: int = 32,
+        max_wait_s: float = 0.005,
+        max_workers: int = 8,
+        key: Optional[Callable[[Request], Hashable]] = None,
+    ):
+        self.score_batch = score_batch
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self.key = key
+        self.batches = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screenspot-score")
+        # threads are released even if nobody calls close()
+        self._finalizer = weakref.finalize(self, self._executor.shutdown, wait=False)
+        self._pending: List[Tuple[Request, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def score(self, model_text: str, info: Dict[str, Any]) -> float:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append(((model_text, info), fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.batches += 1
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _unique(self, reqs: List[Request]) -> Tuple[List[Request], List[int]]:
+        # (distinct requests, index into them for every original request)
+        if self.key is None:
+            return reqs, list(range(len(reqs)))
+        slots: Dict[Hashable, int] = {}
+        unique, where = [], []
+        for req in reqs:
+            k = self.key(req)
+            if k not in slots:
+                slots[k] = len(unique)
+                unique.append(req)
+            where.append(slots[k])
+        return unique, where
+
+    async def _run(self, batch) -> None:
+        loop = asyncio.get_running_loop()
+        unique, where = self._unique([req for req, _ in batch])
+        try:
+            scores = await loop.run_in_executor(self._executor, self.score_batch, unique)
+        except Exception as e:  # surface the failure to every waiter
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), i in zip(batch, where):
+            if not fut.done():
+                fut.set_result(scores[i])
+
+    def close(self) -> None:
+        self._finalizer()
@@ -0,0 +1,149 @@
+import heapq
+import json
+import os
+import socket
+import tempfile
+import time
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+def plan_shards(
+    image_paths: Sequence[str], num_shards: int, per_row_cost: int = 1 << 16
+) -> List[List[int]]:
+    """Split record indices into ``num_shards`` groups of similar total cost.
+
+    ``image_paths`` holds each record's resolved screenshot path; only it is
+    needed, so an AnnotationIndex can supply its path column without
+    decoding whole records.
+
+    A screenshot costs its file size in bytes (it is decoded once per group)
+    plus ``per_row_cost`` byte-equivalents for each of its rows (each row is
+    scored on its own).
+
+    All rows of one screenshot land in the same shard. Screenshots are placed
+    largest-first on the currently lightest shard (LPT), with ties broken by
+    annotation order, so every node computes the same plan from the same
+    annotations. Each shard keeps its rows in annotation order.
+    """
+    if num_shards < 1:
+        raise ValueError(f"num_shards must be >= 1, got {num_shards}")
+    groups: Dict[str, List[int]] = {}
+    for i, path in enumerate(image_paths):
+        groups.setdefault(path, []).append(i)
+    weighted = []
+    for path, rows in groups.items():
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        weighted.append((size + per_row_cost * len(rows), rows))
+    weighted.sort(key=lambda g: (-g[0], g[1][0]))
+
+    heap = [(0, s) for s in range(num_shards)]
+    shards: List[List[int]] = [[] for _ in range(num_shards)]
+    for weight, rows in weighted:
+        load, s = heapq.heappop(heap)
+        shards[s].extend(rows)
+        heapq.heappush(heap, (load + weight, s))
+    for rows in shards:
+        rows.sort()
+    return shards
+
+
+def unit_bounds(n: int, chunk: int) -> List[Tuple[int, int]]:
+    return [(start, min(n, start + chunk)) for start in range(0, n, chunk)]
+
+
+def _write_new(path: str, payload: Dict) -> bool:
+    # O_EXCL create: exactly one process wins, also on NFS v3+ and most
+    # shared filesystems
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    return True
+
+
+def _publish_new(path: str, payload: Dict) -> bool:
+    # Like _write_new, but readers never see a partial file: the payload is
+    # written to a temp file and hard-linked into place, which fails if
+    # ``path`` already exists.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            return False
+        return True
+    finally:
+        os.unlink(tmp)
+
+
+def claim_path(claim_dir: str, unit: int) -> str:
+    return os.path.join(claim_dir, f"unit_{unit:05d}.claim")
+
+
+def unit_output(claim_dir: str, unit: int) -> str:
+    return os.path.join(claim_dir, f"unit_{unit:05d}.jsonl")
+
+
+def unit_summary(claim_dir: str, unit: int) -> str:
+    return os.path.join(claim_dir, f"unit_{unit:05d}.json")
+
+
+def open_plan(
+    claim_dir: str, count: int, chunk: int, timeout_s: float = 10.0
+) -> List[Tuple[int, int]]:
+    """Create or join the work plan in ``claim_dir``; every node must agree on it."""
+    os.makedirs(claim_dir, exist_ok=True)
+    plan = {"count": count, "chunk": chunk}
+    path = os.path.join(claim_dir, "plan.json")
+    if not _publish_new(path, plan):
+        existing = None
+        deadline = time.monotonic() + timeout_s
+        while existing is None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    existing = json.load(f)
+            except (OSError, ValueError):
+                # not visible yet on a shared filesystem
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"{path} is missing or unreadable after {timeout_s:g}s; "
+                        "delete it if it was left by a crashed run"
+                    ) from None
+                time.sleep(0.02)
+        if existing != plan:
+            raise ValueError(
+                f"{path} was created for {existing}, this run has {plan}; "
+                "use the same --annotations/--subset/--claim_chunk on every node"
+            )
+    return unit_bounds(count, chunk)
+
+
+def claim_units(claim_dir: str, num_units: int) -> Iterator[int]:
+    """Yield the units this process wins, in order; faster nodes simply win more.
+
+    A unit whose claimant died stays claimed: delete its ``.claim`` file to
+    hand it out again.
+    """
+    owner = {"host": socket.gethostname(), "pid": os.getpid()}
+    for unit in range(num_units):
+        if os.path.exists(claim_path(claim_dir, unit)):
+            continue
+        if _write_new(claim_path(claim_dir, unit), dict(owner, time=time.time())):
+            yield unit
+
+
+def finished_units(claim_dir: str) -> Tuple[List[int], List[int]]:
+    """Return (done, missing) unit ids for the plan in ``claim_dir``."""
+    with open(os.path.join(claim_dir, "plan.json"), "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    done, missing = [], []
+    for unit in range(len(unit_bounds(plan["count"], plan["chunk"]))):
+        (done if os.path.exists(unit_summary(claim_dir, unit)) else missing).append(unit)
+    return done, missing
@@ -0,0 +1,93 @@
+import queue
+from multiprocessing import shared_memory
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+class SlabImage(NamedTuple):
+    """Descriptor for an RGB image parked in a SlabPool slot; pickles in ~100 bytes."""
+
+    slot: int
+    shape: Tuple[int, int, int]
+    scale: float
+
+
+class SlabPool:
+    """Fixed pool of equal-size uint8 slots in one shared-memory segment.
+
+    The owning process hands a free slot to a worker along with its task; the
+    worker writes the decoded pixels there with ``write_image`` and returns a
+    ``SlabImage`` instead of the pixels, and the owner reads them back with
+    ``read`` and ``release``s the slot for the next task. Only the descriptor
+    crosses the pipe, so a 4K frame costs two memcpys instead of a pickle,
+    a pipe transfer and an unpickle.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int):
+        self.slots = max(1, slots)
+        self.slot_bytes = slot_bytes
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * slot_bytes)
+        self.name = self._shm.name
+        self._free: "queue.Queue[int]" = queue.Queue()
+        for i in range(self.slots):
+            self._free.put(i)
+        self._closed = False
+
+    def acquire(self) -> Optional[int]:
+        # blocks until a slot is free; None once the pool is closed
+        while not self._closed:
+            try:
+                return self._free.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def release(self, slot: int) -> None:
+        self._free.put(slot)
+
+    def view(self, ref: SlabImage) -> np.ndarray:
+        return np.ndarray(ref.shape, dtype=np.uint8, buffer=self._shm.buf, offset=ref.slot * self.slot_bytes)
+
+    def read(self, ref: SlabImage) -> Image.Image:
+        # PIL keeps RGB as 4 bytes/pixel, so this is the one unavoidable copy
+        return Image.fromarray(self.view(ref))
+
+    def close(self) -> None:
+        self._closed = True
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+_ATTACHED: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def write_image(
+    name: str, slot_bytes: int, slot: int, im: Image.Image, scale: float
+) -> Optional[SlabImage]:
+    """Copy ``im`` into ``slot`` of the pool called ``name`` (worker side).
+
+    Returns None when the image does not fit; the caller then sends the
+    pixels the ordinary way.
+    """
+    if im.mode != "RGB":
+        im = im.convert("RGB")
+    shape = (im.height, im.width, 3)
+    if shape[0] * shape[1] * 3 > slot_bytes:
+        return None
+    shm = _ATTACHED.get(name)
+    if shm is None:
+        shm = _ATTACHED[name] = shared_memory.SharedMemory(name=name)
+    dst = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+    dst[...] = np.asarray(im)
+    return SlabImage(slot, shape, scale)
@@ -0,0 +1,161 @@
+import gzip
+import io
+import json
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+_COMPRESSIONS = ("none", "gzip", "zstd")
+_CHUNK = 1 << 16
+_WS = " \t\r\n"
+# A parse error this close to the end of the buffer may just be a value cut
+# off mid-token (longest bare token: "-Infinity").
+_TAIL = 16
+
+
+def _compression_for(path: str, compression: Optional[str]) -> str:
+    if compression and compression != "auto":
+        if compression not in _COMPRESSIONS:
+            raise ValueError(f"unknown compression: {compression}")
+        return compression
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd output needs the 'zstandard' package") from None
+    return zstandard
+
+
+def open_text(path: str, mode: str = "r", compression: Optional[str] = None):
+    """Open a text stream, transparently (de)compressing gzip/zstd by extension."""
+    kind = _compression_for(path, compression)
+    if kind == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if kind == "zstd":
+        zstd = _zstd()
+        raw = open(path, mode + "b")
+        if mode == "r":
+            stream = zstd.ZstdDecompressor().stream_reader(raw, closefd=True)
+        else:
+            stream = zstd.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def iter_json_values(f: IO[str], chunk_size: int = _CHUNK) -> Iterator[Any]:
+    """Lazily yield the values of a JSON Lines stream or of a JSON array.
+
+    The format is picked from the first non-whitespace character. Values are
+    decoded one at a time from a small rolling buffer, so a caller that stops
+    early never reads (or parses) the rest of the stream.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    skip = _WS
+    array = None
+    while True:
+        while pos < len(buf) and buf[pos] in skip:
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                return
+            chunk = f.read(chunk_size)
+            buf, pos, eof = chunk, 0, not chunk
+            continue
+        if array is None:
+            array = buf[pos] == "["
+            if array:
+                # inside an array, commas separate values like whitespace
+                pos += 1
+                skip = _WS + ","
+            continue
+        if array and buf[pos] == "]":
+            return
+        try:
+            val, end = decoder.raw_decode(buf, pos)
+            complete = end < len(buf) or eof
+        except json.JSONDecodeError as e:
+            # only a value that ran off the end of the buffer can be fixed by
+            # reading more; anything else is malformed, so fail now instead
+            # of pulling the rest of the stream into memory
+            cut_off = e.pos >= len(buf) - _TAIL or e.msg.startswith("Unterminated string")
+            if eof or not cut_off:
+                raise
+            complete = False
+        if not complete:
+            # value may continue past the buffer; read more and retry
+            chunk = f.read(chunk_size)
+            buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+            continue
+        pos = end
+        yield val
+
+
+class JsonlWriter:
+    """Streams rows to a JSON Lines file as they complete.
+
+    Rows are buffered and written every ``batch_size`` rows (and on close), so
+    a crash loses at most one batch. gzip/zstd compression is picked from the
+    file extension unless ``compression`` is given. ``append=True`` continues
+    an existing file (gzip and zstd both accept concatenated frames).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compression: Optional[str] = None,
+        batch_size: int = 64,
+        append: bool = False,
+    ):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.count = 0
+        self._buf: List[str] = []
+        self._f = open_text(path, "a" if append else "w", compression)
+
+    def write(self, row: Dict) -> None:
+        self._buf.append(json.dumps(row))
+        self.count += 1
+        if len(self._buf) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buf:
+            self._f.write("\n".join(self._buf) + "\n")
+            self._buf = []
+        self._f.flush()
+
+    def close(self) -> None:
+        if self._f is not None:
+            self.flush()
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def iter_jsonl(path: str, compression: Optional[str] = None) -> Iterator[Dict]:
+    # Undecodable lines (e.g. one torn by a crash mid-write) are skipped, like
+    # load_jsonl; a gzip stream cut off mid-member ends the iteration.
+    with open_text(path, "r", compression) as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        except EOFError:
+            return
@@ -1,5 +1,4 @@
 import argparse
-import json
 import os
 from pathlib import Path
 from typing import List, Dict, Any
@@ -8,19 +7,35 @@ from PIL import Image, ImageDraw
 
 from .dataset import load_examples
 from .metrics import iou_score
-from baselines.screenspot_pro import text_rule, region_search
+from baselines.screenspot_pro import BASELINES, ImageSize, needs_pixels
+from envs.screenspot_pro.writer import JsonlWriter
 
 
-def _predict(example, baseline: str, priors_path: str) -> Dict[str, Any]:
-    img = Image.open(example["image_path"]).convert("RGB")
-    instr = example["instruction"]
-    if baseline == "text":
-        box = text_rule.predict_box(img, instr, priors_path)
-        conf = text_rule.predict_confidence(img, instr, priors_path)
-    else:
-        box = region_search.predict_box(img, instr, priors_path)
-        conf = region_search.predict_confidence(img, instr, priors_path)
-    return {"pred_box": box, "confidence": conf}
+def _load_for(model, image_path: str):
+    # size-only baselines get the header geometry, never the decoded pixels
+    if needs_pixels(model):
+        return Image.open(image_path).convert("RGB")
+    with Image.open(image_path) as im:
+        return ImageSize(*im.size)
+
+
+def _predict_grouped(examples: List[Dict[str, Any]], baseline: str, priors_path: str):
+    """Yield (i, example, pred) in example order, loading each screenshot once."""
+    model = BASELINES[baseline]
+    groups: Dict[str, List[int]] = {}
+    for i, ex in enumerate(examples):
+        groups.setdefault(ex["image_path"], []).append(i)
+    ready: Dict[int, Dict[str, Any]] = {}
+    nxt = 0
+    for path, idxs in groups.items():
+        img = _load_for(model, path)
+        for i in idxs:
+            pred = model.predict(img, examples[i]["instruction"], priors_path)
+            ready[i] = {"pred_box": pred.box, "confidence": pred.confidence}
+        # reorder buffer: emit rows as soon as every earlier example is done
+        while nxt in ready:
+            yield nxt, examples[nxt], ready.pop(nxt)
+            nxt += 1
 
 
 def _draw_calibration(img_path: str, pred_box: List[int], out_png: str) -> None:
@@ -37,8 +52,15 @@ def main():
     parser.add_argument("--root", default=str(Path(__file__).parent), help="Environment root")
     parser.add_argument("--subset", type=int, default=4, help="Limit number of examples")
     parser.add_argument("--max_resolution", type=int, default=1200, help="Max image size")
-    parser.add_argument("--baseline", choices=["text", "region"], default="text", help="Baseline choice")
-    parser.add_argument("--per_example_file", default=None, help="Save per example JSON here")
+    parser.add_argument("--baseline", choices=sorted(BASELINES), default="text", help="Baseline choice")
+    parser.add_argument("--per_example_file", default=None, help="Stream per example JSONL here")
+    parser.add_argument(
+        "--output_compression",
+        choices=["auto", "none", "gzip", "zstd"],
+        default="auto",
+        help="auto picks gzip/zstd from a .gz/.zst suffix",
+    )
+    parser.add_argument("--flush_every", type=int, default=64, help="Rows buffered per write")
     parser.add_argument("--calibration_png", default=None, help="Save one annotated PNG here")
     args = parser.parse_args()
 
@@ -51,13 +73,16 @@ def main():
 
     priors_path = os.path.join(args.root, "priors")  # ok if missing
 
-    per_example: List[Dict[str, Any]] = []
+    writer = None
+    if args.per_example_file:
+        writer = JsonlWriter(args.per_example_file, args.output_compression, args.flush_every)
     total_iou = 0.0
+    n = 0
 
-    for i, ex in enumerate(examples):
-        pred = _predict(ex, args.baseline, priors_path)
+    for i, ex, pred in _predict_grouped(examples, args.baseline, priors_path):
         iou = iou_score(pred["pred_box"], ex["target_box"])
         total_iou += iou
+        n += 1
         row = {
             "id": ex.get("id", i),
             "instruction": ex["instruction"],
@@ -67,17 +92,16 @@ def main():
             "confidence": pred["confidence"],
             "iou": iou,
         }
-        per_example.append(row)
+        if writer is not None:
+            writer.write(row)
 
         if args.calibration_png and i == 0:
             _draw_calibration(ex["image_path"], pred["pred_box"], args.calibration_png)
 
-    avg_iou = total_iou / max(1, len(examples))
-    print(f"smoke eval complete on {len(examples)} examples, avg_iou={avg_iou:.3f}")
-
-    if args.per_example_file:
-        with open(args.per_example_file, "w") as f:
-            json.dump(per_example, f, indent=2)
+    if writer is not None:
+        writer.close()
+    avg_iou = total_iou / max(1, n)
+    print(f"smoke eval complete on {n} examples, avg_iou={avg_iou:.3f}")
 
 
 if __name__ == "__main__":
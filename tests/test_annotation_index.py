@@ -0,0 +1,50 @@
+import pathlib
+import pickle
+
+from envs.screenspot_pro.annotation_index import AnnotationIndex, compile_index
+from envs.screenspot_pro.dataset import load_jsonl
+
+
+def _records():
+    return [
+        {
+            "image_path": f"mock_{i % 3}.png",
+            "instruction": f"click {i % 2}",
+            "bbox": [i, i, i + 5, i + 7],
+            "target_type": ("text", "icon")[i % 2],
+        }
+        for i in range(10)
+    ]
+
+
+def test_roundtrip_and_random_access(tmp_path):
+    recs = _records()
+    assert compile_index(recs, str(tmp_path / "idx")) == 10
+    idx = AnnotationIndex(str(tmp_path / "idx"))
+    assert len(idx) == 10
+    assert list(idx) == recs
+    assert idx[7] == recs[7] and idx[-1] == recs[-1]
+    assert idx.sample(3, seed=1) == idx.sample(3, seed=1)
+    assert pickle.loads(pickle.dumps(idx[2:5]))[0] == recs[2]
+
+
+def test_shards_partition_rows(tmp_path):
+    compile_index(_records(), str(tmp_path / "idx"))
+    idx = AnnotationIndex(str(tmp_path / "idx"))
+    shards = [list(idx.shard(i, 3)) for i in range(3)]
+    assert sum(shards, []) == _records()
+
+
+def test_mock_annotations_compile(tmp_path):
+    repo = pathlib.Path(__file__).resolve().parents[1]
+    ann = repo / "data" / "mock_screenspot_pro" / "annotations.jsonl"
+    recs = load_jsonl(str(ann))
+    compile_index(recs, str(tmp_path / "idx"))
+    assert list(AnnotationIndex(str(tmp_path / "idx"))) == recs
+
+
+def test_image_path_column(tmp_path):
+    compile_index(_records(), str(tmp_path / "idx"))
+    idx = AnnotationIndex(str(tmp_path / "idx"))
+    assert idx.image_paths() == [r["image_path"] for r in _records()]
+    assert idx[3:7].image_paths() == [r["image_path"] for r in _records()[3:7]]
@@ -0,0 +1,21 @@
+import json
+
+from benchmarks.pipeline import STAGES, compare, main
+
+
+def test_pipeline_report_and_compare(tmp_path, capsys):
+    out = tmp_path / "bench.json"
+    args = ["--images", "2", "--resolutions", "320x180", "--force_decode"]
+    assert main(args + ["--out", str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert report["examples"] == 2
+    assert set(report["stages"]) == set(STAGES)
+    assert report["stages"]["decode"]["p50_ms"] > 0
+    capsys.readouterr()
+
+    slow = json.loads(out.read_text())
+    slow["stages"]["predict"]["p50_ms"] *= 10
+    slow["examples_per_s"] /= 10
+    assert compare(report, report, 0.1) == []
+    flagged = {r["metric"] for r in compare(slow, report, 0.1)}
+    assert flagged == {"predict.p50_ms", "examples_per_s"}
@@ -0,0 +1,48 @@
+from PIL import Image
+
+from envs.screenspot_pro.dataset import safe_image_size, safe_open_image
+
+
+def test_fast_decode_matches_scale(tmp_path):
+    for ext in ("png", "jpg"):
+        p = tmp_path / f"im.{ext}"
+        Image.new("RGB", (3840, 2160), (200, 10, 10)).save(p)
+        ref, err, scale = safe_open_image(str(p), 1200)
+        fast, ferr, fscale = safe_open_image(str(p), 1200, fast=True)
+        assert err is None and ferr is None
+        assert fscale == scale
+        assert fast.size == ref.size and fast.mode == "RGB"
+
+
+def test_fast_decode_missing_file(tmp_path):
+    im, err, scale = safe_open_image(str(tmp_path / "nope.png"), 1200, fast=True)
+    assert im is None and err.startswith("file not found") and scale == 1.0
+
+
+def test_header_only_size_matches_decode(tmp_path):
+    p = tmp_path / "im.png"
+    Image.new("RGB", (3840, 1080)).save(p)
+    im, _, scale = safe_open_image(str(p), 1200)
+    geo, err, geo_scale = safe_image_size(str(p), 1200)
+    assert err is None
+    assert geo.size == im.size and (geo.width, geo.height) == im.size
+    assert geo_scale == scale
+
+
+def test_verify_catches_what_the_header_misses(tmp_path):
+    good = tmp_path / "good.png"
+    Image.effect_noise((400, 300), 64).convert("RGB").save(good)
+    data = good.read_bytes()
+    truncated = tmp_path / "truncated.png"
+    truncated.write_bytes(data[: len(data) // 2])
+    flipped = bytearray(data)
+    flipped[len(data) // 2] ^= 0xFF
+    corrupt = tmp_path / "corrupt.png"
+    corrupt.write_bytes(bytes(flipped))
+
+    assert safe_image_size(str(good), verify=True)[1] is None
+    for p in (truncated, corrupt):
+        # header-only reads still succeed; verify and a full decode both fail
+        assert safe_image_size(str(p))[1] is None
+        assert safe_image_size(str(p), verify=True)[1].startswith("os error")
+        assert safe_open_image(str(p))[1].startswith("os error")
@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+from PIL import Image
+
+from envs.screenspot_pro.dataset import safe_open_image
+from envs.screenspot_pro.image_cache import ImageCache
+
+
+def _img(path, color):
+    Image.new("RGB", (2400, 1200), color).save(path)
+    return str(path)
+
+
+def test_warm_read_is_mmap_and_identical(tmp_path):
+    src = _img(tmp_path / "a.png", (10, 20, 30))
+    cache = ImageCache(str(tmp_path / "cache"))
+    cold, err, scale = safe_open_image(src, 1200, cache=cache)
+    assert err is None and cache.stats() == {"hits": 0, "misses": 1}
+
+    warm_cache = ImageCache(str(tmp_path / "cache"))
+    arr, warm_scale = warm_cache.get(src, 1200)
+    assert isinstance(arr, np.memmap)
+    assert warm_scale == scale
+    warm, _, _ = safe_open_image(src, 1200, cache=warm_cache)
+    assert warm.size == cold.size
+    assert np.array_equal(np.asarray(warm), np.asarray(cold))
+    # a different max_resolution is a different entry
+    assert warm_cache.get(src, 600) is None
+
+
+def test_lru_eviction_respects_cap(tmp_path):
+    a = _img(tmp_path / "a.png", (1, 1, 1))
+    b = _img(tmp_path / "b.png", (2, 2, 2))
+    c = _img(tmp_path / "c.png", (3, 3, 3))
+    entry = 1200 * 600 * 3
+    cache = ImageCache(str(tmp_path / "cache"), max_bytes=2 * entry)
+    safe_open_image(a, 1200, cache=cache)
+    safe_open_image(b, 1200, cache=cache)
+    assert cache.get(a, 1200) is not None  # a is now more recent than b
+    safe_open_image(c, 1200, cache=cache)
+    assert cache.get(b, 1200) is None
+    assert cache.get(a, 1200) is not None
+    assert cache.get(c, 1200) is not None
+
+
+def test_puts_merge_index_in_batches(tmp_path):
+    srcs = [_img(tmp_path / f"s{i}.png", (i, i, i)) for i in range(5)]
+    cache = ImageCache(str(tmp_path / "cache"), flush_every=3)
+    index = tmp_path / "cache" / "index.json"
+    for src in srcs[:2]:
+        safe_open_image(src, 600, cache=cache)
+    assert not index.exists()
+    # a second process sees unmerged entries through their sidecars
+    other = ImageCache(str(tmp_path / "cache"))
+    assert other.get(srcs[0], 600) is not None
+    safe_open_image(srcs[2], 600, cache=cache)
+    assert len(json.loads(index.read_text())) == 3
+    safe_open_image(srcs[3], 600, cache=cache)
+    cache.close()
+    assert len(json.loads(index.read_text())) == 4
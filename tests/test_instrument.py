@@ -0,0 +1,31 @@
+import json
+
+from envs.screenspot_pro.instrument import NULL, Instrumentation
+
+
+def test_null_is_inert():
+    with NULL.stage("decode"):
+        NULL.count("skipped")
+    assert NULL.export() is None and NULL.summary() == {}
+
+
+def test_stages_counters_merge_and_trace(tmp_path):
+    trace = tmp_path / "trace.json"
+    parent = Instrumentation(str(trace))
+    worker = Instrumentation(keep_events=True)
+    for _ in range(3):
+        with worker.stage("predict"):
+            pass
+    worker.count("bytes_read", 100)
+    worker.count("bytes_read", 50)
+    with parent.stage("serialize"):
+        parent.merge(worker.export())
+    parent.close()
+
+    summary = parent.summary()
+    assert summary["stages"]["predict"]["count"] == 3
+    assert summary["stages"]["serialize"]["count"] == 1
+    assert summary["counters"] == {"bytes_read": 150}
+    events = json.loads(trace.read_text())
+    assert sorted(e["name"] for e in events) == ["predict"] * 3 + ["serialize"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
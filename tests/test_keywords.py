@@ -0,0 +1,22 @@
+import random
+
+from baselines.screenspot_pro import region_search
+from baselines.screenspot_pro.keywords import KeywordMatcher
+
+_WORDS = ["tool", "toolbar", "bar", "sidebar", "side", "status", "file", "x", "click", "the"]
+
+
+def test_matcher_equals_substring_scan():
+    m = KeywordMatcher(["tool", "toolbar", "bar", "sidebar", "status", "file"])
+    rng = random.Random(3)
+    for _ in range(2000):
+        text = "".join(rng.choice(_WORDS) + rng.choice(["", " "]) for _ in range(rng.randint(0, 6)))
+        assert m.find(text) == {k for k in m.keywords if k in text}
+    assert KeywordMatcher([]).find("anything") == frozenset()
+
+
+def test_prior_scores_match_hit_counts():
+    ins = "Click the Toolbar icon button on the bottom status bar"
+    scores = region_search._score_priors(ins)
+    for key, words in region_search._HITS.items():
+        assert scores[key] == sum(1 for w in words if w in ins.lower())
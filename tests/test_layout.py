@@ -0,0 +1,77 @@
+from PIL import Image
+
+from baselines.screenspot_pro import BASELINES, ImageSize, layout, needs_pixels, text_rule
+from envs.screenspot_pro.metrics import center_in_box
+from tools.make_more_mocks import mk, target_for
+
+
+def _mock(tmp_path, i, W, H):
+    gold, _, ins = target_for(i, W, H)
+    path = tmp_path / f"m{i}_{W}.png"
+    mk(str(path), W, H, gold, ins)
+    return Image.open(path).convert("RGB"), gold, ins
+
+
+def test_registered_as_pixel_baseline():
+    assert BASELINES["layout"] is layout
+    assert needs_pixels(layout)
+
+
+def test_finds_outlined_target_exactly(tmp_path):
+    for W, H in ((1920, 1080), (3840, 2160)):
+        for i in range(4):
+            im, gold, ins = _mock(tmp_path, i, W, H)
+            pred = layout.predict(im, ins, "")
+            assert pred.box == gold
+            assert pred.confidence >= 0.75
+
+
+def test_bands_from_profiles(tmp_path):
+    im, _, _ = _mock(tmp_path, 0, 1920, 1080)
+    bands, _ = layout._analyze(im)
+    assert bands == {
+        "menu": [0, 0, 1920, 54],
+        "toolbar": [0, 54, 1920, 130],
+        "status": [0, 993, 1920, 1080],
+        "sidebar": [0, 130, 231, 993],
+    }
+
+
+def test_downscaled_screens_still_hit(tmp_path):
+    for i in range(4):
+        im, gold, ins = _mock(tmp_path, i, 1920, 1080)
+        small = im.resize((1200, 675), Image.BILINEAR)
+        g = [int(v * 0.625) for v in gold]
+        assert center_in_box(layout.predict(small, ins, "").box, g, 1200, 675)
+
+
+def test_without_pixels_or_outline_falls_back_to_text_rule(tmp_path):
+    ins = "check the status bar"
+    assert layout.predict(ImageSize(1920, 1080), ins, "") == text_rule.predict(ImageSize(1920, 1080), ins, "")
+    blank = Image.new("RGB", (800, 600), (235, 238, 242))
+    assert layout.predict(blank, ins, "") == text_rule.predict((800, 600), ins, "")
+
+
+def test_analysis_cache_is_per_live_image_and_thread_safe(tmp_path):
+    import gc
+    import threading
+
+    images = [_mock(tmp_path, i, 1920, 1080) for i in range(4)]
+    before = len(layout._ANALYSES)
+    results = {}
+
+    def run(k):
+        for j in range(20):
+            im, gold, ins = images[(k + j) % 4]
+            results[k, j] = layout.predict(im, ins, "").box == gold
+
+    threads = [threading.Thread(target=run, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(results.values()) and len(results) == 80
+    assert len(layout._ANALYSES) == before + 4
+    images.clear()
+    gc.collect()
+    assert len(layout._ANALYSES) == before
@@ -0,0 +1,72 @@
+import json
+import random
+
+import pytest
+
+from envs.screenspot_pro.metrics import SummaryAccumulator, summarize
+
+
+def _rows(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        x0, y0 = rng.randint(0, 1500), rng.randint(0, 900)
+        w, h = rng.choice([(20, 20), (300, 200), (900, 400)])
+        rows.append(
+            {
+                "success": rng.random() < 0.4,
+                "target_type": rng.choice(["text", "icon"]),
+                "gold_box": [x0, y0, x0 + w, y0 + h],
+                "confidence": rng.random(),
+            }
+        )
+    return rows
+
+
+def test_merged_partials_equal_single_pass():
+    rows = _rows(1000)
+    whole = SummaryAccumulator()
+    for r in rows:
+        whole.update(r)
+    parts = [SummaryAccumulator() for _ in range(3)]
+    for i, r in enumerate(rows):
+        parts[i % 3].update(r)
+    merged = SummaryAccumulator()
+    for p in parts:
+        # shards on other nodes ship their state as JSON
+        merged.merge(SummaryAccumulator.from_export(json.loads(json.dumps(p.export()))))
+    assert merged.export() == whole.export()
+    assert merged.finalize() == whole.finalize() == summarize(rows)
+    assert sum(whole.cnt_conf) == whole.n == 1000
+
+
+def test_accumulator_is_slotted():
+    acc = SummaryAccumulator()
+    assert not hasattr(acc, "__dict__")
+    assert acc.finalize() == {"success_rate": 0.0}
+
+
+def test_custom_edges_and_batch_update_match_rows():
+    import numpy as np
+
+    rows = _rows(500, seed=3)
+    edges = [500, 100000]
+    one = SummaryAccumulator(bucket_edges=edges)
+    for r in rows:
+        one.update(r)
+    batch = SummaryAccumulator(bucket_edges=edges)
+    for part in (rows[:123], rows[123:]):
+        batch.update_batch(
+            [r["success"] for r in part],
+            [r["target_type"] for r in part],
+            np.array([r["gold_box"] for r in part]),
+            [r["confidence"] for r in part],
+        )
+    assert batch.export() == one.export()
+    names = {f"area_{a}_{b}_success_rate" for a, b in ((0, 500), (500, 100000), (100000, "inf"))}
+    assert names <= set(one.finalize())
+    bins = one.calibration()["bins"]
+    total = sum(b["count"] * b["confidence"] for b in bins)
+    assert abs(total - sum(r["confidence"] for r in rows)) < 1e-3
+    with pytest.raises(ValueError):
+        one.merge(SummaryAccumulator())
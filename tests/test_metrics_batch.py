@@ -0,0 +1,49 @@
+import importlib.util
+import pathlib
+import random
+
+import numpy as np
+
+from envs.screenspot_pro.metrics import (
+    center_in_box,
+    center_in_box_batch,
+    iou_batch,
+    summarize,
+    summarize_batch,
+)
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+_spec = importlib.util.spec_from_file_location("root_metrics", _ROOT / "metrics.py")
+root_metrics = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(root_metrics)
+
+
+def _box(rng, W, H):
+    x0, x1 = sorted(rng.randint(-20, W + 20) for _ in range(2))
+    y0, y1 = sorted(rng.randint(-20, H + 20) for _ in range(2))
+    return [x0, y0, x1, y1]
+
+
+def test_batch_matches_scalar():
+    rng = random.Random(0)
+    rows = []
+    for _ in range(2000):
+        W, H = rng.choice([(1200, 337), (1920, 1080), (3840, 2160)])
+        rows.append((_box(rng, W, H), _box(rng, W, H), W, H, rng.choice(["text", "icon"])))
+    pred = np.array([r[0] for r in rows])
+    gold = np.array([r[1] for r in rows])
+    W = np.array([r[2] for r in rows])
+    H = np.array([r[3] for r in rows])
+
+    ious = iou_batch(pred, gold)
+    hits = center_in_box_batch(pred, gold, W, H)
+    for i, (p, g, w, h, _) in enumerate(rows):
+        assert ious[i] == root_metrics.iou_score(p, g)
+        assert bool(hits[i]) == center_in_box(p, g, w, h)
+
+    per = [
+        {"success": bool(hits[i]), "target_type": r[4], "gold_box": r[1]}
+        for i, r in enumerate(rows)
+    ]
+    assert summarize_batch(hits, [r[4] for r in rows], gold) == summarize(per)
+    assert summarize_batch([], [], np.zeros((0, 4))) == summarize([])
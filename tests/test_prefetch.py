@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from envs.screenspot_pro.prefetch import Prefetcher
+
+
+def test_results_in_order_with_bounded_depth():
+    lock = threading.Lock()
+    live = [0, 0]  # current, peak
+
+    def fn(i):
+        with lock:
+            live[0] += 1
+            live[1] = max(live[1], live[0])
+        time.sleep(0.002 * (i % 3))
+        with lock:
+            live[0] -= 1
+        return i * i
+
+    assert list(Prefetcher(fn, range(40), depth=3, threads=4)) == [i * i for i in range(40)]
+    assert live[1] <= 3
+
+
+def test_memory_cap_limits_read_ahead():
+    started = []
+
+    def fn(i):
+        started.append(i)
+        return i
+
+    it = iter(Prefetcher(fn, range(10), depth=8, threads=1, max_bytes=2, size_of=lambda r: 1))
+    assert next(it) == 0
+    time.sleep(0.05)
+    # at most two finished results are buffered, plus the one being read
+    assert len(started) <= 4
+    assert list(it) == list(range(1, 10))
+
+
+def test_errors_surface_at_their_position():
+    def fn(i):
+        if i == 2:
+            raise ValueError("bad item")
+        return i
+
+    it = iter(Prefetcher(fn, range(5), depth=4))
+    assert [next(it), next(it)] == [0, 1]
+    with pytest.raises(ValueError):
+        next(it)
@@ -0,0 +1,185 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+import numpy as np
+from PIL import Image
+
+from baselines.screenspot_pro import layout
+from envs.screenspot_pro.pyramid import Pyramid, PyramidCache
+from tools.make_more_mocks import mk
+
+
+def _noise(path, W, H, seed=0):
+    arr = np.random.default_rng(seed).integers(0, 256, (H, W, 3), dtype=np.uint8)
+    Image.fromarray(arr).save(path)
+    return str(path)
+
+
+def test_levels_are_exact_reduce_chain(tmp_path):
+    src = _noise(tmp_path / "a.png", 203, 101)
+    pyr = Pyramid(src, PyramidCache())
+    assert pyr.level_size(1) == (102, 51) and pyr.level_size(2) == (51, 26)
+    assert pyr.depth == 3 and pyr.level_for(60) == 2 and pyr.level_for(None) == 0
+    want = Image.open(src).convert("RGB").reduce(2).reduce(2)
+    # level 2 straight away, and again after level 1 alone was evicted
+    assert np.array_equal(np.asarray(pyr.level(2)), np.asarray(want))
+    fresh = Pyramid(src, PyramidCache(max_bytes=1))
+    assert np.array_equal(np.asarray(fresh.level(2)), np.asarray(want))
+
+
+def test_box_mapping_is_exact(tmp_path):
+    src = _noise(tmp_path / "a.png", 203, 101)
+    pyr = Pyramid(src)
+    # an inclusive level box covers exactly the original pixels averaged into it
+    assert pyr.to_original([0, 0, 0, 0], 2) == [0, 0, 3, 3]
+    assert pyr.to_original([50, 25, 50, 25], 2) == [200, 100, 202, 100]
+    box = [17, 9, 140, 77]
+    for level in range(pyr.depth):
+        coarse = pyr.from_original(box, level)
+        assert pyr.from_original(pyr.to_original(coarse, level), level) == coarse
+        back = pyr.to_original(coarse, level)
+        assert back[0] <= box[0] and back[1] <= box[1] and back[2] >= box[2] and back[3] >= box[3]
+
+    tile = pyr.tile(box, 0, pad=5)
+    assert tile.origin == (12, 4)
+    full = np.asarray(pyr.level(0))
+    assert np.array_equal(np.asarray(tile.image), full[4:83, 12:146])
+    # a box found inside the tile lands on the same original pixels
+    assert pyr.to_original([5, 5, 128, 73], 0, tile.origin) == box
+
+
+def test_lru_budget(tmp_path):
+    a = _noise(tmp_path / "a.png", 64, 64, 1)
+    b = _noise(tmp_path / "b.png", 64, 64, 2)
+    level0 = 64 * 64 * 3
+    cache = PyramidCache(max_bytes=level0 + level0 // 4)
+    pa, pb = Pyramid(a, cache, min_side=32), Pyramid(b, cache, min_side=32)
+    pa.level(1)  # builds and keeps a/0 and a/1
+    assert cache.nbytes == level0 + level0 // 4
+    pa.level(0)
+    pb.level(0)  # evicts a/1 first, then a/0
+    assert cache.get(pa.key, 0) is None and cache.get(pa.key, 1) is None
+    assert cache.get(pb.key, 0) is not None
+    assert cache.nbytes <= cache.max_bytes
+    small = PyramidCache(max_bytes=10)
+    small.put("big", 0, Image.new("RGB", (8, 8)))
+    assert small.get("big", 0) is None and small.nbytes == 0
+
+
+def test_level0_outlives_a_budget_too_small_for_it(tmp_path, monkeypatch):
+    from envs.screenspot_pro import pyramid
+
+    src = _noise(tmp_path / "a.png", 640, 360)
+    opened = []
+    real_open = pyramid.Image.open
+    monkeypatch.setattr(pyramid.Image, "open", lambda p: opened.append(p) or real_open(p))
+    pyr = Pyramid(src, PyramidCache(max_bytes=100_000), size=(640, 360))
+    for _ in range(3):
+        found = pyr.search(
+            lambda im: [([0, 0, 9, 9], 1.0), ([20, 20, 29, 29], 0.5)],
+            lambda tile: ([0, 0, 4, 4], 1.0),
+            overview=160,
+        )
+        assert len(found) == 2
+    assert opened == [src]
+
+
+def test_search_refines_on_full_res_tiles(tmp_path):
+    src = _noise(tmp_path / "a.png", 400, 200)
+    pyr = Pyramid(src)
+    seen = []
+
+    def propose(im):
+        seen.append(im.size)
+        return [([10, 10, 20, 20], 0.5), ([40, 5, 45, 9], 0.9)]
+
+    def refine(tile):
+        seen.append(tile.size)
+        return ([1, 2, 3, 4], tile.width) if tile.width >= 60 else None
+
+    found = pyr.search(propose, refine, overview=100, pad=2)
+    assert seen[0] == (100, 50)
+    # [10, 10, 20, 20] at level 2 is original [40, 40, 83, 83]; padded by 8 the
+    # tile starts at (32, 32). The narrower candidate is rejected.
+    assert seen[1:] == [(40, 36), (60, 60)]  # best proposal first
+    assert found == [([33, 34, 35, 36], 60)]
+    assert pyr.search(propose, refine, overview=None) == [([40, 5, 45, 9], 0.9), ([10, 10, 20, 20], 0.5)]
+
+
+def test_layout_finds_tiny_4k_targets_exactly(tmp_path):
+    cache = PyramidCache()
+    cases = [
+        ([300, 30, 318, 48], "click the File menu"),
+        ([1500, 150, 1516, 166], "select the save icon"),
+        ([3500, 2050, 3516, 2066], "check the status bar"),
+    ]
+    for i, (gold, ins) in enumerate(cases):
+        path = tmp_path / f"t{i}.png"
+        mk(str(path), 3840, 2160, gold, ins)
+        pred = layout.predict_pyramid(Pyramid(str(path), cache), ins, "", overview=1200)
+        assert pred.box == gold and pred.confidence == 0.9
+
+
+def test_eval_pyramid_scores_in_original_pixels(tmp_path):
+    repo = pathlib.Path(__file__).resolve().parents[1]
+    per = tmp_path / "per.jsonl"
+    cmd = [
+        sys.executable,
+        "-m",
+        "envs.screenspot_pro.eval",
+        "--annotations",
+        str(repo / "data" / "mock_screenspot_pro" / "annotations.jsonl"),
+        "--root",
+        str(repo),
+        "--max_resolution",
+        "1200",
+        "--baseline",
+        "layout",
+        "--pyramid_mb",
+        "64",
+        "--per_example_file",
+        str(per),
+    ]
+    js = json.loads(subprocess.check_output(cmd, cwd=repo))
+    assert js["success_rate"] == 1.0
+    for line in per.read_text().splitlines():
+        row = json.loads(line)
+        assert row["scale"] == 1.0 and row["pred_box"] == row["gold_box"]
+
+
+def test_eval_pyramid_skips_undecodable_group_once(tmp_path):
+    repo = pathlib.Path(__file__).resolve().parents[1]
+    good = tmp_path / "good.png"
+    mk(str(good), 1920, 1080, [10, 10, 110, 40], "click the File menu")
+    bad = tmp_path / "bad.png"
+    # a valid header followed by a truncated body: the size probe passes, the decode fails
+    bad.write_bytes(good.read_bytes()[:2000])
+    ann = tmp_path / "ann.jsonl"
+    rows = [
+        {"image_path": str(p), "instruction": ins, "bbox": [10, 10, 110, 40], "target_type": "text"}
+        for p in (bad, good, bad)
+        for ins in ("click the File menu", "open the File menu")
+    ]
+    ann.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    cmd = [
+        sys.executable,
+        "-m",
+        "envs.screenspot_pro.eval",
+        "--annotations",
+        str(ann),
+        "--root",
+        str(repo),
+        "--baseline",
+        "layout",
+        "--pyramid_mb",
+        "64",
+        "--profile",
+    ]
+    js = json.loads(subprocess.check_output(cmd, cwd=repo))
+    assert js["evaluated_count"] == 2 and js["success_rate"] == 1.0
+    assert js["skipped_count"] == 4
+    assert {s["path"] for s in js["skipped_paths"]} == {str(bad)}
+    # one decode per screenshot, not one per record
+    assert js["profile"]["stages"]["decode"]["count"] == 2
@@ -0,0 +1,25 @@
+import json
+import os
+
+from baselines.screenspot_pro import region_search
+
+
+def test_priors_keyed_by_path_and_reloaded_on_change(tmp_path):
+    a, b = tmp_path / "a.json", tmp_path / "b.json"
+    a.write_text(json.dumps({"menu": [0, 0, 0.5, 0.5]}))
+    b.write_text(json.dumps({"status": [0, 0.5, 1, 1]}))
+    assert region_search.predict((100, 100), "menu", str(a)).box == [0, 0, 50, 50]
+    assert region_search.predict((100, 100), "menu", str(b)).box == [0, 50, 100, 100]
+
+    a.write_text(json.dumps({"menu": [0, 0, 0.25, 0.25]}))
+    st = os.stat(a)
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert region_search.predict((100, 100), "menu", str(a)).box == [0, 0, 25, 25]
+
+
+def test_missing_priors_fall_back_to_builtin(tmp_path):
+    shipped = os.path.join(os.path.dirname(region_search.__file__), "priors.json")
+    for missing in ("", str(tmp_path / "nope.json"), str(tmp_path)):
+        for ins in ("click the File menu", "status bar", "zzz"):
+            got = region_search.predict((1920, 1080), ins, missing)
+            assert got == region_search.predict((1920, 1080), ins, shipped)
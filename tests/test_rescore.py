@@ -0,0 +1,82 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+from envs.screenspot_pro.rescore import iter_per_example, main
+
+
+def test_rescore_matches_eval_summary(tmp_path, capsys):
+    repo = pathlib.Path(__file__).resolve().parents[1]
+    per = tmp_path / "per.json"
+    cmd = [
+        sys.executable,
+        "-m",
+        "envs.screenspot_pro.eval",
+        "--annotations",
+        str(repo / "data" / "mock_screenspot_pro" / "annotations.jsonl"),
+        "--root",
+        str(repo),
+        "--max_resolution",
+        "1200",
+        "--baseline",
+        "text",
+        "--per_example_file",
+        str(per),
+    ]
+    summary = json.loads(subprocess.check_output(cmd, cwd=repo))
+    rows = list(iter_per_example(str(per)))
+    assert rows == [json.loads(line) for line in per.read_text().splitlines()]
+
+    main([str(per)])
+    report = json.loads(capsys.readouterr().out)["files"][str(per)]
+    keys = ("success_rate", "text_success_rate", "small_success_rate", "large_success_rate")
+    for k in keys:
+        assert report[k] == summary[k]
+    assert report["evaluated_count"] == summary["evaluated_count"]
+
+
+def test_rescore_custom_buckets_and_jsonl(tmp_path, capsys):
+    base = {"W": 100, "H": 100}
+    rows = [
+        dict(base, pred_box=[0, 0, 10, 10], gold_box=[0, 0, 10, 10], target_type="text", confidence=0.9),
+        dict(base, pred_box=[50, 50, 60, 60], gold_box=[0, 0, 40, 40], target_type="icon", confidence=0.2),
+    ]
+    p = tmp_path / "per.jsonl"
+    p.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    main([str(p), "--bucket_edges", "500", "--success", "iou", "--iou_threshold", "0.9"])
+    report = json.loads(capsys.readouterr().out)["files"][str(p)]
+    assert report["success_rate"] == 0.5
+    assert report["area_0_500_success_rate"] == 1.0
+    assert report["area_500_inf_success_rate"] == 0.0
+    assert report["mean_iou"] == 0.5
+
+
+def test_torn_trailing_line_like_merge(tmp_path, capsys):
+    import gzip
+
+    from envs.screenspot_pro.merge import merge
+
+    base = {"W": 100, "H": 100, "target_type": "text", "confidence": 0.5}
+    rows = [
+        dict(base, pred_box=[0, 0, 10, 10], gold_box=[0, 0, 10, 10], success=True),
+        dict(base, pred_box=[50, 50, 60, 60], gold_box=[0, 0, 40, 40], success=False),
+    ]
+    text = "".join(json.dumps(r) + "\n" for r in rows) + json.dumps(rows[0])[:25]
+    plain = tmp_path / "torn.jsonl"
+    plain.write_text(text)
+    packed = tmp_path / "torn.jsonl.gz"
+    packed.write_bytes(gzip.compress(text.encode())[:-12])  # also cut the gzip trailer
+    assert list(iter_per_example(str(plain))) == rows
+    for p in (plain, packed):
+        # rescore now reads exactly the rows merge does, instead of raising
+        merged = merge([str(p)])["evaluated_count"]
+        main([str(p)])
+        report = json.loads(capsys.readouterr().out)["files"][str(p)]
+        assert report["evaluated_count"] == merged
+        if p == plain:
+            assert merged == 2 and report["success_rate"] == 0.5
+
+    array = tmp_path / "rows.json"
+    array.write_text(json.dumps(rows, indent=2))
+    assert list(iter_per_example(str(array))) == rows
@@ -0,0 +1,90 @@
+import importlib.util
+import io
+import json
+import pathlib
+
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+_spec = importlib.util.spec_from_file_location("root_dataset", _ROOT / "dataset.py")
+root_dataset = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(root_dataset)
+
+
+def _recs(n, long_at=None):
+    out = []
+    for i in range(n):
+        instr = f"click item {i}"
+        if i == long_at:
+            # longer than one 64 KiB read, so the value straddles chunk boundaries
+            instr += " x" * 40000
+        out.append(
+            {"id": i, "instruction": instr, "bbox": [i, i, i + 5, i + 5], "image_path": f"img{i}.png"}
+        )
+    return out
+
+
+def _read(path):
+    return list(root_dataset._read_annotations(path))
+
+
+def test_jsonl(tmp_path):
+    p = tmp_path / "a.jsonl"
+    recs = _recs(5)
+    p.write_text("".join(json.dumps(r) + "\n" for r in recs) + "\n\n", encoding="utf-8")
+    assert _read(p) == recs
+
+
+def test_pretty_printed_array(tmp_path):
+    p = tmp_path / "a.json"
+    recs = _recs(5)
+    p.write_text(json.dumps(recs, indent=2), encoding="utf-8")
+    assert _read(p) == recs
+
+
+def test_value_spanning_chunk_boundary(tmp_path):
+    recs = _recs(4, long_at=1)
+    assert len(json.dumps(recs[1])) > 1 << 16
+    p = tmp_path / "a.jsonl"
+    p.write_text("".join(json.dumps(r) + "\n" for r in recs), encoding="utf-8")
+    assert _read(p) == recs
+    q = tmp_path / "a.json"
+    q.write_text(json.dumps(recs, indent=1), encoding="utf-8")
+    assert _read(q) == recs
+
+
+def test_single_object_and_empty_file(tmp_path):
+    p = tmp_path / "one.json"
+    rec = _recs(1)[0]
+    p.write_text(json.dumps(rec, indent=2), encoding="utf-8")
+    assert _read(p) == [rec]
+    empty = tmp_path / "empty.jsonl"
+    empty.write_text("  \n", encoding="utf-8")
+    assert _read(empty) == []
+
+
+def test_subset_stops_reading_early(tmp_path, monkeypatch):
+    ann = tmp_path / "data" / "mock" / "annotations.jsonl"
+    ann.parent.mkdir(parents=True)
+    recs = _recs(20000)
+    ann.write_text("".join(json.dumps(r) + "\n" for r in recs), encoding="utf-8")
+    size = ann.stat().st_size
+
+    reads = []
+    real_open = pathlib.Path.open
+
+    class Counting(io.TextIOWrapper):
+        def read(self, n=-1):
+            chunk = super().read(n)
+            reads.append(len(chunk))
+            return chunk
+
+    def counting_open(self, mode="r", encoding=None, **kwargs):
+        return Counting(real_open(self, "rb"), encoding=encoding)
+
+    monkeypatch.setattr(pathlib.Path, "open", counting_open)
+    out = root_dataset.load_examples(str(ann), str(tmp_path), subset=3)
+    assert [ex["instruction"] for ex in out] == ["click item 0", "click item 1", "click item 2"]
+    assert out[0]["target_box"] == [0, 0, 5, 5]
+    assert out[0]["image_path"] == str(tmp_path / "data" / "mock" / "images" / "img0.png")
+    # a single 64 KiB read of a multi-MB file; it never reached EOF
+    assert size > 1 << 20
+    assert reads == [1 << 16]
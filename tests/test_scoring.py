@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from envs.screenspot_pro.scoring import BatchedScorer, FallbackMemo
+
+
+def _scorer(calls, **kw):
+    def score_batch(reqs):
+        calls.append([text for text, _ in reqs])
+        return [float(len(text)) for text, _ in reqs]
+
+    return BatchedScorer(score_batch, **kw)
+
+
+def test_max_batch_flushes_without_waiting():
+    calls = []
+    scorer = _scorer(calls, max_batch=3, max_wait_s=60)
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(*(scorer.score("x" * i, {}) for i in range(6))), timeout=5
+        )
+
+    assert asyncio.run(main()) == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert calls == [["", "x", "xx"], ["xxx", "xxxx", "xxxxx"]]
+    assert scorer.batches == 2
+    scorer.close()
+
+
+def test_timer_flushes_partial_batch():
+    calls = []
+    scorer = _scorer(calls, max_batch=32, max_wait_s=0.01)
+
+    async def main():
+        first = await asyncio.gather(scorer.score("a", {}), scorer.score("bb", {}))
+        second = await scorer.score("ccc", {})
+        return first, second
+
+    assert asyncio.run(main()) == ([1.0, 2.0], 3.0)
+    assert calls == [["a", "bb"], ["ccc"]]
+    scorer.close()
+
+
+def test_duplicates_scored_once_per_batch():
+    calls = []
+    scorer = _scorer(calls, max_batch=4, key=lambda req: req[0])
+
+    async def main():
+        return await asyncio.gather(*(scorer.score(t, {}) for t in ("a", "bb", "a", "a")))
+
+    assert asyncio.run(main()) == [1.0, 2.0, 1.0, 1.0]
+    assert calls == [["a", "bb"]]
+    scorer.close()
+
+
+def test_exception_reaches_every_caller_and_scorer_recovers():
+    fail = threading.Event()
+    fail.set()
+
+    def score_batch(reqs):
+        if fail.is_set():
+            raise ValueError("boom")
+        return [1.0] * len(reqs)
+
+    scorer = BatchedScorer(score_batch, max_batch=2)
+
+    async def main():
+        res = await asyncio.gather(scorer.score("a", {}), scorer.score("b", {}), return_exceptions=True)
+        fail.clear()
+        return res, await asyncio.gather(scorer.score("a", {}), scorer.score("b", {}))
+
+    res, ok = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in res)
+    assert ok == [1.0, 1.0]
+    assert not scorer._tasks
+    scorer.close()
+
+
+def test_close_shuts_down_threads():
+    scorer = _scorer([], max_batch=1)
+    assert asyncio.run(scorer.score("a", {})) == 1.0
+    scorer.close()
+    with pytest.raises(RuntimeError):
+        scorer._executor.submit(print)
+
+
+def _race(memo, key, compute, n=8):
+    # n threads miss ``key`` at the same moment; returns results or exceptions
+    barrier = threading.Barrier(n)
+    out = [None] * n
+
+    def run(i):
+        barrier.wait()
+        try:
+            out[i] = memo.get_or_compute(key, compute)
+        except Exception as e:
+            out[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+
+def _slow(calls, result=None, error=None):
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        if error is not None:
+            raise error
+        return list(result)
+
+    return compute
+
+
+def test_memo_concurrent_misses_compute_once():
+    memo, calls = FallbackMemo(), []
+    out = _race(memo, "k", _slow(calls, [1, 2, 3, 4]))
+    assert calls == [1]
+    assert out == [[1, 2, 3, 4]] * 8
+    assert memo.stats() == {"hits": 7, "misses": 1, "size": 1}
+
+
+def test_memo_counts_and_returns_copies():
+    memo = FallbackMemo()
+    box = memo.get_or_compute("a", lambda: [0, 0, 5, 5])
+    box.append(99)
+    assert memo.get_or_compute("a", lambda: [9, 9, 9, 9]) == [0, 0, 5, 5]
+    memo.get_or_compute("b", lambda: [1, 1, 2, 2])
+    assert memo.stats() == {"hits": 1, "misses": 2, "size": 2}
+
+
+def test_memo_lru_bound():
+    memo = FallbackMemo(maxsize=2)
+    for k in ("a", "b"):
+        memo.get_or_compute(k, lambda: [0, 0, 1, 1])
+    memo.get_or_compute("a", lambda: [0, 0, 1, 1])  # a is now newest
+    memo.get_or_compute("c", lambda: [0, 0, 1, 1])
+    assert memo.stats()["size"] == 2
+    calls = []
+    memo.get_or_compute("b", lambda: calls.append(1) or [0, 0, 1, 1])
+    assert calls == [1]
+    memo.get_or_compute("c", lambda: calls.append(1) or [0, 0, 1, 1])
+    assert calls == [1]
+
+
+def test_memo_owner_error_reaches_waiters():
+    memo, calls = FallbackMemo(), []
+    out = _race(memo, "k", _slow(calls, error=OSError("truncated")))
+    assert calls == [1]
+    assert all(isinstance(e, OSError) and str(e) == "truncated" for e in out)
+    assert memo.stats()["size"] == 0
+    # nothing was cached, so the next call computes again
+    assert memo.get_or_compute("k", lambda: [1, 1, 2, 2]) == [1, 1, 2, 2]
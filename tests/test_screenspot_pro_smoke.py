@@ -27,3 +27,133 @@ def test_smoke():
     assert "success_rate" in js
     assert "avg_inference_time_ms" in js
     assert js["evaluated_count"] >= 1
+
+
+def _run_eval(repo, out, *extra):
+    ann = repo / "data" / "mock_screenspot_pro" / "annotations.jsonl"
+    cmd = [
+        sys.executable,
+        "-m",
+        "envs.screenspot_pro.eval",
+        "--annotations",
+        str(ann),
+        "--root",
+        str(repo),
+        "--max_resolution",
+        "1200",
+        "--per_example_file",
+        str(out),
+        *extra,
+    ]
+    return json.loads(subprocess.check_output(cmd, cwd=repo))
+
+
+def test_workers_match_serial(tmp_path):
+    repo = pathlib.Path(__file__).resolve().parents[1]
+    serial = _run_eval(repo, tmp_path / "serial.json")
+    pooled = _run_eval(repo, tmp_path / "pooled.json", "--workers", "2")
+    for k in ("avg_inference_time_ms", "wall_time_s"):
+        serial.pop(k)
+        pooled.pop(k)
+    assert serial == pooled
+    assert (tmp_path / "serial.json").read_text() == (tmp_path / "pooled.json").read_text()
+
+
+def test_resume_matches_uninterrupted(tmp_path):
+    repo = pathlib.Path(__file__).resolve().parents[1]
+    full = _run_eval(repo, tmp_path / "full.jsonl")
+    part = tmp_path / "part.jsonl"
+    _run_eval(repo, part, "--subset", "3")
+    with open(part, "a") as f:
+        f.write('{"image_path": "torn')  # preempted mid-write
+    resumed = _run_eval(repo, part, "--resume")
+    assert resumed.pop("resumed_count") == 3
+    for k in ("avg_inference_time_ms", "wall_time_s"):
+        full.pop(k)
+        resumed.pop(k)
+    assert resumed == full
+    assert part.read_text() == (tmp_path / "full.jsonl").read_text()
+
+
+def test_each_image_loaded_once_rows_in_order(tmp_path):
+    repo = pathlib.Path(__file__).resolve().parents[1]
+    src = repo / "data" / "mock_screenspot_pro" / "annotations.jsonl"
+    rows = [json.loads(line) for line in src.read_text().splitlines()][:3]
+    # every screenshot three times, interleaved with the others
+    rows = [dict(r, instruction=f"{r['instruction']} #{k}") for k in range(3) for r in rows]
+    ann = tmp_path / "ann.jsonl"
+    ann.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    per = tmp_path / "per.jsonl"
+    cmd = [
+        sys.executable,
+        "-m",
+        "envs.screenspot_pro.eval",
+        "--annotations",
+        str(ann),
+        "--root",
+        str(repo),
+        "--per_example_file",
+        str(per),
+        "--profile",
+    ]
+    js = json.loads(subprocess.check_output(cmd, cwd=repo))
+    assert js["profile"]["stages"]["header"]["count"] == 3
+    assert js["profile"]["stages"]["predict"]["count"] == 9
+    out = [json.loads(line)["instruction"] for line in per.read_text().splitlines()]
+    assert out == [r["instruction"] for r in rows]
+
+
+def test_prefetch_matches_serial(tmp_path):
+    repo = pathlib.Path(__file__).resolve().parents[1]
+    src = repo / "data" / "mock_screenspot_pro" / "annotations.jsonl"
+    rows = [json.loads(line) for line in src.read_text().splitlines()]
+    rows.insert(3, dict(rows[0], image_path="missing.png"))
+    ann = tmp_path / "ann.jsonl"
+    ann.write_text("".join(json.dumps(r) + "\n" for r in rows))
+    runs = []
+    for extra in ([], ["--prefetch", "3", "--prefetch_threads", "2"]):
+        per = tmp_path / f"per{len(runs)}.jsonl"
+        cmd = [
+            sys.executable,
+            "-m",
+            "envs.screenspot_pro.eval",
+            "--annotations",
+            str(ann),
+            "--root",
+            str(repo),
+            "--per_example_file",
+            str(per),
+            *extra,
+        ]
+        js = json.loads(subprocess.check_output(cmd, cwd=repo))
+        for k in ("avg_inference_time_ms", "wall_time_s"):
+            js.pop(k)
+        runs.append((js, per.read_text()))
+    assert runs[0] == runs[1]
+    assert runs[0][0]["skipped_count"] == 1
+    assert runs[0][0]["skipped_paths"][0]["path"].endswith("missing.png")
+
+
+def test_verify_images_matches_decode_skips(tmp_path):
+    from tools.make_more_mocks import mk
+
+    repo = pathlib.Path(__file__).resolve().parents[1]
+    good = tmp_path / "good.png"
+    mk(str(good), 1920, 1080, [10, 10, 110, 40], "click the File menu")
+    bad = tmp_path / "bad.png"
+    bad.write_bytes(good.read_bytes()[:3000])
+    ann = tmp_path / "ann.jsonl"
+    rows = [
+        {"image_path": str(p), "instruction": "click the File menu", "bbox": [10, 10, 110, 40], "target_type": "text"}
+        for p in (good, bad)
+    ]
+    ann.write_text("".join(json.dumps(r) + "\n" for r in rows))
+
+    def skipped(*extra):
+        cmd = [sys.executable, "-m", "envs.screenspot_pro.eval", "--annotations", str(ann), *extra]
+        summary = json.loads(subprocess.check_output(cmd, cwd=repo))
+        return [s["path"] for s in summary.get("skipped_paths", [])]
+
+    assert skipped("--baseline", "text") == []
+    assert skipped("--baseline", "text", "--verify_images") == [str(bad)]
+    assert skipped("--baseline", "layout") == [str(bad)]
@@ -0,0 +1,126 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+from envs.screenspot_pro.merge import merge
+from envs.screenspot_pro.sharding import open_plan, plan_shards
+
+_REPO = pathlib.Path(__file__).resolve().parents[1]
+_ANN = _REPO / "data" / "mock_screenspot_pro" / "annotations.jsonl"
+_METRICS = ("success_rate", "text_success_rate", "icon_success_rate", "evaluated_count")
+
+
+def _eval_cmd(*extra):
+    return [
+        sys.executable,
+        "-m",
+        "envs.screenspot_pro.eval",
+        "--annotations",
+        str(_ANN),
+        "--root",
+        str(_REPO),
+        "--max_resolution",
+        "1200",
+        *extra,
+    ]
+
+
+def test_plan_balances_bytes_and_keeps_images_together(tmp_path):
+    sizes = [900, 500, 400, 300, 300, 100]
+    records, size_of = [], {}
+    for i, size in enumerate(sizes):
+        path = str(tmp_path / f"img{i}.png")
+        pathlib.Path(path).write_bytes(b"x" * size)
+        size_of[path] = size
+        records += [{"image_path": path}] * (2 if i == 3 else 1)
+    shards = plan_shards([r["image_path"] for r in records], 2, per_row_cost=0)
+    assert sorted(sum(shards, [])) == list(range(len(records)))
+    assert all(rows == sorted(rows) for rows in shards)
+    assert {3, 4} <= set(shards[0]) or {3, 4} <= set(shards[1])
+    # each screenshot is decoded once per shard, however many rows it has
+    loads = [sum(size_of[p] for p in {records[i]["image_path"] for i in rows}) for rows in shards]
+    assert abs(loads[0] - loads[1]) <= 300
+    assert plan_shards([r["image_path"] for r in records], 2, per_row_cost=0) == shards
+
+
+def test_plan_weighs_rows_as_well_as_bytes(tmp_path):
+    big, small = str(tmp_path / "big.png"), str(tmp_path / "small.png")
+    pathlib.Path(big).write_bytes(b"x" * 1000)
+    pathlib.Path(small).write_bytes(b"x" * 10)
+    paths = [big] + [small] * 8 + [str(tmp_path / f"gone{i}.png") for i in range(4)]
+    # bytes alone put the 8-row screenshot with all four unreadable ones
+    assert plan_shards(paths, 2, per_row_cost=0) == [[0], list(range(1, 13))]
+    # at 100 bytes per row: big costs 1100, small 810, each missing one 100
+    assert plan_shards(paths, 2, per_row_cost=100) == [[0, 12], list(range(1, 12))]
+
+
+def test_open_plan_agrees_and_times_out_on_a_broken_plan(tmp_path):
+    claim = tmp_path / "claims"
+    assert open_plan(str(claim), 10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert open_plan(str(claim), 10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert [p.name for p in claim.iterdir()] == ["plan.json"]
+    with pytest.raises(ValueError, match="claim_chunk"):
+        open_plan(str(claim), 10, 5)
+
+    (claim / "plan.json").write_text("")
+    with pytest.raises(TimeoutError, match="plan.json"):
+        open_plan(str(claim), 10, 4, timeout_s=0.05)
+
+
+def test_shards_merge_to_serial(tmp_path):
+    serial = json.loads(subprocess.check_output(_eval_cmd(), cwd=_REPO))
+    files, sums = [], []
+    for i in range(3):
+        per = tmp_path / f"s{i}.jsonl"
+        out = subprocess.check_output(
+            _eval_cmd("--num_shards", "3", "--shard_index", str(i), "--per_example_file", str(per)),
+            cwd=_REPO,
+        )
+        (tmp_path / f"s{i}.json").write_bytes(out)
+        files.append(str(per))
+        sums.append(str(tmp_path / f"s{i}.json"))
+    report = merge(files, sums)
+    assert {k: report[k] for k in _METRICS} == {k: serial[k] for k in _METRICS}
+
+
+def test_claim_dir_work_stealing(tmp_path):
+    claim = tmp_path / "claims"
+    cmd = _eval_cmd("--claim_dir", str(claim), "--claim_chunk", "2")
+    procs = [subprocess.Popen(cmd, cwd=_REPO, stdout=subprocess.PIPE) for _ in range(3)]
+    claimed = []
+    for p in procs:
+        out, _ = p.communicate()
+        assert p.returncode == 0
+        claimed += json.loads(out)["claimed_units"]
+    assert sorted(claimed) == list(range(5))
+
+    subprocess.check_output(_eval_cmd("--per_example_file", str(tmp_path / "serial.jsonl")), cwd=_REPO)
+    report = merge([str(claim)], out=str(tmp_path / "merged.jsonl"))
+    assert "missing_units" not in report and report["evaluated_count"] == 10
+    assert (tmp_path / "merged.jsonl").read_text() == (tmp_path / "serial.jsonl").read_text()
+
+
+def test_shard_spec_is_contiguous_slice(tmp_path):
+    from envs.screenspot_pro.annotation_index import compile_index
+    from envs.screenspot_pro.dataset import load_jsonl
+
+    records = load_jsonl(str(_ANN))
+    idx = tmp_path / "idx"
+    compile_index(records, str(idx))
+    got = []
+    for i in range(3):
+        per = tmp_path / f"c{i}.jsonl"
+        cmd = _eval_cmd("--shard", f"{i}/3", "--per_example_file", str(per))
+        cmd[cmd.index(str(_ANN))] = str(idx)
+        subprocess.check_output(cmd, cwd=_REPO)
+        got.append([json.loads(line)["instruction"] for line in per.read_text().splitlines()])
+    assert [len(g) for g in got] == [3, 3, 4]
+    assert sum(got, []) == [r["instruction"] for r in records]
+
+    both = subprocess.run(
+        _eval_cmd("--shard", "0/3", "--num_shards", "3"), cwd=_REPO, capture_output=True
+    )
+    assert both.returncode != 0 and b"alternatives" in both.stderr
@@ -0,0 +1,84 @@
+import functools
+import multiprocessing
+
+import numpy as np
+from PIL import Image
+
+from envs.screenspot_pro.eval import _shm_map
+from envs.screenspot_pro.shm import SlabImage, SlabPool, write_image
+
+
+def _frame(i, w=64, h=40):
+    arr = (np.arange(h * w * 3, dtype=np.uint32).reshape(h, w, 3) * (i + 1) % 251).astype(np.uint8)
+    return Image.fromarray(arr)
+
+
+def _write(task, name, slot_bytes):
+    i, slot = task
+    return slot, write_image(name, slot_bytes, slot, _frame(i), 0.5)
+
+
+def test_slab_roundtrip_across_processes():
+    with SlabPool(2, 64 * 40 * 3) as slab:
+        work = functools.partial(_write, name=slab.name, slot_bytes=slab.slot_bytes)
+        tasks = ((i, slab.acquire()) for i in range(6))
+        with multiprocessing.Pool(2) as pool:
+            for i, (slot, ref) in enumerate(pool.imap(work, tasks)):
+                assert isinstance(ref, SlabImage) and ref.shape == (40, 64, 3)
+                assert np.array_equal(np.asarray(slab.read(ref)), np.asarray(_frame(i)))
+                slab.release(slot)
+
+
+def test_oversized_image_is_not_parked():
+    with SlabPool(1, 100) as slab:
+        assert write_image(slab.name, slab.slot_bytes, 0, _frame(0), 1.0) is None
+
+
+def _load(rs):
+    i = rs[0]
+    im = _frame(i, 80 + i, 50) if i != 3 else _frame(i, 400, 400)  # 3 overflows a slot
+    return rs, f"img{i}", im, None, 1.0, None
+
+
+def _score(loaded):
+    rs, path, im, err, scale, prof = loaded
+    return path, im.size, int(np.asarray(im, dtype=np.int64).sum())
+
+
+def test_shm_map_matches_direct():
+    tasks = [[i] for i in range(8)]
+    expected = [_score(_load(t)) for t in tasks]
+    got = list(_shm_map(_load, _score, iter(tasks), workers=2, slots=2, slot_bytes=100 * 60 * 3))
+    assert got == expected
+
+
+def test_eval_layout_through_shm_matches_serial(tmp_path):
+    import json
+    import pathlib
+    import subprocess
+    import sys
+
+    repo = pathlib.Path(__file__).resolve().parents[1]
+    outs = []
+    for extra in ([], ["--workers", "2", "--shm_slots", "2"]):
+        per = tmp_path / f"per{len(outs)}.jsonl"
+        cmd = [
+            sys.executable,
+            "-m",
+            "envs.screenspot_pro.eval",
+            "--annotations",
+            str(repo / "data" / "mock_screenspot_pro" / "annotations.jsonl"),
+            "--root",
+            str(repo),
+            "--max_resolution",
+            "1200",
+            "--baseline",
+            "layout",
+            "--per_example_file",
+            str(per),
+            *extra,
+        ]
+        js = json.loads(subprocess.check_output(cmd, cwd=repo))
+        assert js["success_rate"] == 1.0
+        outs.append(per.read_text())
+    assert outs[0] == outs[1]
@@ -16,3 +16,35 @@ def test_keywords_exist():
     assert text_rule.predict_box(Img(1200, 675), "select the save icon", "x")
     assert text_rule.predict_box(Img(1200, 675), "open the sidebar panel", "x")
     assert text_rule.predict_box(Img(1200, 675), "check the status bar", "x")
+
+
+def test_predict_matches_box_and_confidence():
+    import os
+
+    from baselines.screenspot_pro import region_search
+
+    priors = os.path.join(os.path.dirname(text_rule.__file__), "priors.json")
+    sizes = [(1200, 337), (1920, 1080), (3840, 2160), (1920, 1080)]
+    instructions = ["click the File menu", "open the nav", "check the status bar", "zoom"]
+    for mod in (text_rule, region_search):
+        many = mod.predict_many(sizes, instructions, priors)
+        for (W, H), ins, p in zip(sizes, instructions, many):
+            img = Img(W, H)
+            assert p == mod.predict((W, H), ins, priors)
+            assert p.box == mod.predict_box(img, ins, priors)
+            assert p.confidence == mod.predict_confidence(img, ins, priors)
+
+
+def test_anchor_batch_is_bit_exact():
+    import random
+
+    rng = random.Random(5)
+    sizes = [(1, 1), (0, 0), (7, 3), (1200, 337), (1920, 1080), (3840, 2160), (3840, 1080)]
+    sizes += [(rng.randint(1, 5000), rng.randint(1, 3000)) for _ in range(3000)]
+    W = [w for w, _ in sizes]
+    H = [h for _, h in sizes]
+    batch = text_rule.anchor_boxes_batch(W, H)
+    assert batch.shape == (len(sizes), len(text_rule._ANCHOR_KEYS), 4)
+    for n, (w, h) in enumerate(sizes):
+        for k, key in enumerate(text_rule._ANCHOR_KEYS):
+            assert batch[n, k].tolist() == text_rule._anchor_box(key, w, h)
@@ -0,0 +1,58 @@
+import gzip
+import json
+
+from envs.screenspot_pro.writer import JsonlWriter, iter_jsonl
+
+
+def test_jsonl_round_trip_gzip(tmp_path):
+    path = tmp_path / "per.jsonl.gz"
+    rows = [{"i": i, "success": i % 2 == 0} for i in range(10)]
+    with JsonlWriter(str(path), batch_size=3) as w:
+        for r in rows:
+            w.write(r)
+    assert list(iter_jsonl(str(path))) == rows
+    with gzip.open(path, "rt") as f:
+        assert json.loads(f.readline()) == rows[0]
+
+
+def test_flushes_each_batch_and_appends(tmp_path):
+    path = tmp_path / "per.jsonl"
+    w = JsonlWriter(str(path), batch_size=2)
+    w.write({"i": 0})
+    assert path.read_text() == ""
+    w.write({"i": 1})
+    assert len(path.read_text().splitlines()) == 2
+    w.close()
+    with JsonlWriter(str(path), append=True) as w:
+        w.write({"i": 2})
+    assert [r["i"] for r in iter_jsonl(str(path))] == [0, 1, 2]
+
+
+def test_malformed_value_fails_without_reading_the_rest():
+    import io
+
+    import pytest
+
+    from envs.screenspot_pro.writer import iter_json_values
+
+    class Counting(io.StringIO):
+        reads = 0
+
+        def read(self, n=-1):
+            Counting.reads += 1
+            return super().read(n)
+
+    good = json.dumps({"instruction": "x" * 100, "bbox": [1, 2, 3, 4]}) + "\n"
+    stream = Counting('{"ok": 1}\n{bad\n' + good * 50000)  # ~6 MB
+    values = iter_json_values(stream, chunk_size=1 << 16)
+    assert next(values) == {"ok": 1}
+    with pytest.raises(json.JSONDecodeError):
+        next(values)
+    assert Counting.reads == 1
+
+    # values cut off mid-string and mid-token at a chunk edge still parse
+    rows = [{"s": "y" * 70000, "t": True, "n": -1.5}, {"s": "z", "t": False, "n": None}] * 3
+    text = "\n".join(json.dumps(r) for r in rows)
+    for size in (7, 64, 1000, 1 << 16):
+        assert list(iter_json_values(io.StringIO(text), chunk_size=size)) == rows
+        assert list(iter_json_values(io.StringIO(json.dumps(rows, indent=1)), chunk_size=size)) == rows
@@ -0,0 +1,77 @@
+"""Microbenchmark: keyword routing over many instructions, naive scan vs KeywordMatcher.
+
+    PYTHONPATH=. python tools/bench_matcher.py --n 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from baselines.screenspot_pro import region_search, text_rule  # noqa: E402
+
+_VERBS = ["click", "open", "select", "check", "press", "toggle"]
+_OBJECTS = [
+    "the File menu", "the save icon", "the sidebar panel", "the status bar",
+    "the Edit menu", "the ribbon button", "the nav drawer", "the progress bar",
+    "the zoom slider", "the search box on the left", "the bottom toolbar",
+]
+
+
+def _naive_scores(instruction):
+    ins = instruction.lower()
+    return {k: sum(1 for w in words if w in ins) for k, words in region_search._HITS.items()}
+
+
+def _naive_anchor(instruction):
+    # the hand-written if-chain text_rule._keyword_box used before _route
+    ins = instruction.lower()
+    if "file" in ins:
+        return "file"
+    if "save" in ins:
+        return "save"
+    if "sidebar" in ins:
+        return "sidebar"
+    if "status" in ins:
+        return "status"
+    return None
+
+
+def _route_anchor(instruction):
+    return text_rule._route(instruction)[0]
+
+
+def _time(fn, items):
+    t0 = time.perf_counter()
+    for s in items:
+        fn(s)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    rng = random.Random(args.seed)
+    items = [f"{rng.choice(_VERBS)} {rng.choice(_OBJECTS)} {i}" for i in range(args.n)]
+
+    for s in items[:1000]:
+        assert _naive_scores(s) == region_search._score_priors(s)
+        assert _naive_anchor(s) == _route_anchor(s)
+
+    report = {
+        "instructions": args.n,
+        "prior_scores_naive_s": _time(_naive_scores, items),
+        "prior_scores_matcher_s": _time(region_search._score_priors, items),
+        "anchor_naive_s": _time(_naive_anchor, items),
+        "anchor_route_s": _time(_route_anchor, items),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Time and peak RSS per image for safe_open_image, default vs fast decode.
+
+Each mode runs in a fresh subprocess so ru_maxrss reflects only that mode.
+
+    PYTHONPATH=. python tools/bench_safe_open.py --n 8 --max_resolution 1200
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools.make_more_mocks import mk  # noqa: E402
+
+
+def _make_images(out_dir, n, W, H):
+    paths = []
+    for i in range(n):
+        png = os.path.join(out_dir, f"bench_{i}.png")
+        mk(png, W, H, [W - 180, H - 60, W - 40, H - 10], "status")
+        jpg = os.path.join(out_dir, f"bench_{i}.jpg")
+        Image.open(png).convert("RGB").save(jpg, quality=90)
+        paths.extend([png, jpg])
+    return paths
+
+
+def _child(paths, max_resolution, fast):
+    from envs.screenspot_pro.dataset import safe_open_image
+
+    times = {"png": [], "jpg": []}
+    for p in paths:
+        t0 = time.perf_counter()
+        im, err, scale = safe_open_image(p, max_resolution, fast=fast)
+        times[p.rsplit(".", 1)[1]].append(time.perf_counter() - t0)
+        assert err is None, err
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    out = {k: 1000.0 * sum(v) / len(v) for k, v in times.items() if v}
+    print(json.dumps({"ms_per_image": out, "peak_rss_mb": peak_kb / 1024.0}))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=8)
+    ap.add_argument("--width", type=int, default=3840)
+    ap.add_argument("--height", type=int, default=2160)
+    ap.add_argument("--max_resolution", type=int, default=1200)
+    ap.add_argument("--_child", choices=["default", "fast"], default=None)
+    ap.add_argument("--_paths", nargs="*", default=None)
+    args = ap.parse_args()
+
+    if args._child:
+        _child(args._paths, args.max_resolution, args._child == "fast")
+        return
+
+    with tempfile.TemporaryDirectory() as d:
+        paths = _make_images(d, args.n, args.width, args.height)
+        report = {}
+        for mode in ("default", "fast"):
+            cmd = [
+                sys.executable,
+                __file__,
+                "--max_resolution",
+                str(args.max_resolution),
+                "--_child",
+                mode,
+                "--_paths",
+                *paths,
+            ]
+            report[mode] = json.loads(subprocess.check_output(cmd))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
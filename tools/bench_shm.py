@@ -0,0 +1,94 @@
+"""Worker -> parent image transport: pickled PIL images vs SlabPool shared memory.
+
+Workers decode screenshots and hand the RGB pixels back to the parent, which
+is where a single in-process model would run predict. Reports images/sec and
+the parent's CPU time per image (all threads, so unpickling in the pool's
+result thread counts) for each transport.
+
+    PYTHONPATH=. python tools/bench_shm.py --n 24 --workers 4 --width 3840 --height 2160
+"""
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from envs.screenspot_pro.shm import SlabPool, write_image  # noqa: E402
+from tools.make_more_mocks import mk  # noqa: E402
+
+
+def _decode(path):
+    return Image.open(path).convert("RGB")
+
+
+def _pickled(path):
+    return _decode(path)
+
+
+def _to_slab(task, name, slot_bytes):
+    path, slot = task
+    return slot, write_image(name, slot_bytes, slot, _decode(path), 1.0)
+
+
+def _run_pickle(paths, workers):
+    with multiprocessing.Pool(workers) as pool:
+        for im in pool.imap(_pickled, paths):
+            im.load()
+
+
+def _run_shm(paths, workers, slots, slot_bytes):
+    with SlabPool(slots, slot_bytes) as slab:
+
+        def feed():
+            for p in paths:
+                yield p, slab.acquire()
+
+        work = functools.partial(_to_slab, name=slab.name, slot_bytes=slot_bytes)
+        with multiprocessing.Pool(workers) as pool:
+            for slot, ref in pool.imap(work, feed()):
+                slab.read(ref)
+                slab.release(slot)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=24)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--slots", type=int, default=8)
+    ap.add_argument("--width", type=int, default=3840)
+    ap.add_argument("--height", type=int, default=2160)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(min(args.n, 4)):
+            p = os.path.join(tmp, f"bench_{i}.png")
+            mk(p, args.width, args.height, [40, 40, 200, 90], "File")
+            paths.append(p)
+        paths = [paths[i % len(paths)] for i in range(args.n)]
+        slot_bytes = args.width * args.height * 3
+
+        report = {"images": args.n, "workers": args.workers, "mb_per_image": slot_bytes / 2**20}
+        for name, run in (
+            ("pickle", lambda: _run_pickle(paths, args.workers)),
+            ("shm", lambda: _run_shm(paths, args.workers, args.slots, slot_bytes)),
+        ):
+            t0, c0 = time.perf_counter(), time.process_time()
+            run()
+            wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+            report[name] = {
+                "images_per_s": args.n / wall,
+                "parent_cpu_ms_per_image": 1000.0 * cpu / args.n,
+            }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
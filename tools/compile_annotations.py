@@ -0,0 +1,28 @@
+"""Compile annotations.jsonl into a memory-mapped AnnotationIndex directory.
+
+    PYTHONPATH=. python tools/compile_annotations.py \
+        data/mock_screenspot_pro/annotations.jsonl /tmp/annotations.idx
+
+The output can be passed straight to ``envs.screenspot_pro.eval --annotations``.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from envs.screenspot_pro.annotation_index import compile_index  # noqa: E402
+from envs.screenspot_pro.dataset import load_jsonl  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("annotations")
+    ap.add_argument("out_dir")
+    args = ap.parse_args()
+    n = compile_index(load_jsonl(args.annotations), args.out_dir)
+    print("Wrote", args.out_dir, "with", n, "entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,17 @@ def mk(img_path, W, H, gold, text):
     im.save(img_path)
 
 
+def target_for(i, W, H):
+    # scatter targets across menu/toolbar/sidebar/status
+    if i % 4 == 0:
+        return [10, 10, 110, 40], "text", "click the File menu"
+    if i % 4 == 1:
+        return [200, 70, 240, 100], "icon", "select the save icon"
+    if i % 4 == 2:
+        return [80, 200, 120, 260], "text", "open the sidebar panel"
+    return [W - 180, H - 60, W - 40, H - 10], "text", "check the status bar"
+
+
 def main():
     root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     data_dir = os.path.join(root, "data", "mock_screenspot_pro")
@@ -32,23 +43,7 @@ def main():
     random.seed(7)
     for i in range(10):
         W, H = (1920, 1080) if i % 3 != 0 else (3840, 1080)
-        # scatter targets across menu/toolbar/sidebar/status
-        if i % 4 == 0:
-            gold = [10, 10, 110, 40]
-            tt = "text"
-            inst = "click the File menu"
-        elif i % 4 == 1:
-            gold = [200, 70, 240, 100]
-            tt = "icon"
-            inst = "select the save icon"
-        elif i % 4 == 2:
-            gold = [80, 200, 120, 260]
-            tt = "text"
-            inst = "open the sidebar panel"
-        else:
-            gold = [W - 180, H - 60, W - 40, H - 10]
-            tt = "text"
-            inst = "check the status bar"
+        gold, tt, inst = target_for(i, W, H)
         name = f"mock_{i}.png"
         mk(os.path.join(data_dir, name), W, H, gold, inst)
         entries.append(
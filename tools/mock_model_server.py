@@ -0,0 +1,190 @@
+"""Local stand-in for an OpenAI-compatible chat model, for throughput testing.
+
+Serves POST /v1/chat/completions and answers with a bounding box after a
+configurable latency. A fraction of replies carry no box, which exercises the
+baseline fallback in ScreenSpotSingleTurn. Point the verifiers client at it
+with an OpenAI base URL of http://127.0.0.1:<port>/v1.
+
+    python tools/mock_model_server.py --port 8011 --latency_ms 40 --no_box_rate 0.3
+    python tools/mock_model_server.py --bench --requests 2000 --concurrency 256
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+_INSTRUCTION = re.compile(r"for: (.*)$", re.S)
+
+
+def _reply_box(prompt: str, rng: random.Random):
+    ins = prompt.lower()
+    if "file" in ins:
+        return [10, 10, 110, 40]
+    if "save" in ins:
+        return [200, 70, 240, 100]
+    if "sidebar" in ins:
+        return [80, 200, 120, 260]
+    x0, y0 = rng.randint(0, 1000), rng.randint(0, 500)
+    return [x0, y0, x0 + rng.randint(20, 900), y0 + rng.randint(20, 500)]
+
+
+def _completion(body: dict, args, rng: random.Random) -> dict:
+    prompt = ""
+    for msg in body.get("messages", []):
+        if msg.get("role") == "user" and isinstance(msg.get("content"), str):
+            prompt = msg["content"]
+    m = _INSTRUCTION.search(prompt)
+    instruction = m.group(1) if m else prompt
+    if rng.random() < args.no_box_rate:
+        text = "I cannot tell."
+    else:
+        text = json.dumps(_reply_box(instruction, rng))
+    return {
+        "id": f"mock-{rng.getrandbits(32):08x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}
+        ],
+        "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 8, "total_tokens": 0},
+    }
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    method, path, _ = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return method, path, headers, body
+
+
+def _response(status: str, payload: dict) -> bytes:
+    data = json.dumps(payload).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\nConnection: keep-alive\r\n\r\n"
+    )
+    return head.encode("latin-1") + data
+
+
+def make_handler(args):
+    rng = random.Random(args.seed)
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    method, path, _, body = await _read_request(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+                    await asyncio.sleep(max(0.0, rng.gauss(args.latency_ms, args.jitter_ms)) / 1000.0)
+                    writer.write(_response("200 OK", _completion(json.loads(body or b"{}"), args, rng)))
+                elif method == "GET" and path.rstrip("/").endswith("/models"):
+                    writer.write(_response("200 OK", {"object": "list", "data": [{"id": "mock"}]}))
+                else:
+                    writer.write(_response("404 Not Found", {"error": path}))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def _bench_client(host, port, n, concurrency):
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(n):
+        queue.put_nowait(i)
+
+    async def worker():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                prompt = f"Return the bounding box as [x0,y0,x1,y1] for: click the File menu {i}"
+                body = json.dumps(
+                    {"model": "mock", "messages": [{"role": "user", "content": prompt}]}
+                ).encode("utf-8")
+                t0 = time.perf_counter()
+                writer.write(
+                    f"POST /v1/chat/completions HTTP/1.1\r\nHost: {host}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+                await _read_request_response(reader)
+                latencies.append(time.perf_counter() - t0)
+        finally:
+            writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+
+    def pct(p):
+        return 1000.0 * latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "wall_time_s": wall,
+        "requests_per_s": len(latencies) / wall if wall else None,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+async def _read_request_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.decode("latin-1").split("\r\n"):
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    return await reader.readexactly(length)
+
+
+async def _main(args):
+    server = await asyncio.start_server(make_handler(args), args.host, args.port, backlog=4096)
+    port = server.sockets[0].getsockname()[1]
+    if not args.bench:
+        print(f"mock model server on http://{args.host}:{port}/v1", flush=True)
+        async with server:
+            await server.serve_forever()
+        return
+    async with server:
+        report = await _bench_client(args.host, port, args.requests, args.concurrency)
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8011)
+    ap.add_argument("--latency_ms", type=float, default=40.0)
+    ap.add_argument("--jitter_ms", type=float, default=10.0)
+    ap.add_argument("--no_box_rate", type=float, default=0.3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--bench", action="store_true", help="start on a free port and load-test it")
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=256)
+    args = ap.parse_args()
+    if args.bench:
+        args.port = 0
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()